@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 Ansible Project
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The resource module builder without ansible-playbook
+
+Builds the same files as site.yml from the same roles, templates and
+filter plugins, rendered in process:
+
+    rmb.py build --rm-dest <destination> --structure role --model <model>
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type  # pylint: disable=C0103
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import yaml
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+from ansible.errors import AnsibleError
+from ansible.module_utils._text import to_bytes
+from ansible.module_utils.six import string_types
+from ansible.plugins.filter.core import to_bool
+
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+INIT_ROLE = os.path.join(BASE_DIR, 'roles', 'init')
+SCAFFOLD_ROLE = os.path.join(BASE_DIR, 'roles', 'scaffold_rm_facts')
+FILTER_PLUGINS_DIR = os.path.join(SCAFFOLD_ROLE, 'filter_plugins')
+TEMPLATES_DIR = os.path.join(SCAFFOLD_ROLE, 'templates')
+
+
+def _load_source(name, path):
+    try:
+        from importlib.util import spec_from_file_location, module_from_spec
+    except ImportError:
+        import imp  # pylint: disable=W0402
+        return imp.load_source(name, path)
+    spec = spec_from_file_location(name, path)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_filters():
+    """ Load the filters of each of the filter plugins of the roles, and the
+        bool filter of ansible for the vars of the roles
+    """
+    filters = {'bool': to_bool}
+    for name in sorted(os.listdir(FILTER_PLUGINS_DIR)):
+        if name.endswith('.py'):
+            module = _load_source('rmb_filter_%s' % name[:-3],
+                                  os.path.join(FILTER_PLUGINS_DIR, name))
+            filters.update(module.FilterModule().filters())
+    return filters
+
+
+def _finalize(thing):
+    # the same as ansible, None is rendered as an empty string
+    return thing if thing is not None else ''
+
+
+def _render(env, value, variables):
+    if isinstance(value, dict):
+        return dict((k, _render(env, v, variables)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_render(env, v, variables) for v in value]
+    if isinstance(value, string_types) and '{{' in value:
+        return env.from_string(value).render(variables)
+    return value
+
+
+def load_vars(env, path, variables):
+    """ Load the vars of a role, each is rendered in the order of the file
+        unless it is already set, the same as an extra var
+    """
+    with open(path) as fileh:
+        role_vars = yaml.safe_load(fileh)
+    for key, value in role_vars.items():
+        if key not in variables:
+            variables[key] = _render(env, value, variables)
+
+
+def _makedirs(path):
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+
+def _write(path, data):
+    """ Write the file when its content changes
+
+    :rtype: bool
+    :returns: True when the file was written
+    """
+    if os.path.isfile(path):
+        with open(path, 'rb') as fileh:
+            if fileh.read() == data:
+                return False
+    with open(path, 'wb') as fileh:
+        fileh.write(data)
+    return True
+
+
+def _checksum(path):
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as fileh:
+        return hashlib.sha1(fileh.read()).hexdigest()
+
+
+def build(args):
+    """ Build the files for a model, the same as the init and
+        scaffold_rm_facts roles
+    """
+    filters = load_filters()
+    env = Environment(trim_blocks=True, keep_trailing_newline=True,
+                      undefined=StrictUndefined, finalize=_finalize,
+                      loader=FileSystemLoader(TEMPLATES_DIR))
+    env.filters.update(filters)
+
+    variables = {
+        'model': args.model,
+        'rm_dest': os.path.expanduser(args.rm_dest),
+        'structure': args.structure,
+        'build_cache': args.build_cache,
+        'slim': args.slim,
+    }
+    if args.collection_org:
+        variables['collection_org'] = args.collection_org
+    if args.collection_name:
+        variables['collection_name'] = args.collection_name
+    collection = args.collection_org and args.collection_name
+    if args.structure == 'collection' and not collection:
+        raise AnsibleError("'collection_org' and 'collection_name' are"
+                           " required when 'structure' is collection")
+
+    # the init role
+    load_vars(env, os.path.join(INIT_ROLE, 'vars', 'main.yml'), variables)
+    rm = filters['to_model'](args.model, variables['model_cache_dir'])
+    variables['rm'] = rm
+    variables['rm_docmentation'] = rm['documentation']
+    variables['rm_ansible_metadata'] = rm['metadata']
+
+    for item in variables['directories'][args.structure]:
+        _makedirs(os.path.join(variables['rm_dest'], item))
+
+    license_file = rm.get('LICENSE') or 'gpl-3.0.txt'
+    license_src = os.path.join(INIT_ROLE, 'files', license_file)
+    if not os.path.isfile(license_src):
+        license_src = os.path.expanduser(license_file)
+    with open(license_src, 'rb') as fileh:
+        _write(os.path.join(variables['rm_dest'], 'LICENSE.txt'), fileh.read())
+
+    # the scaffold_rm_facts role
+    load_vars(env, os.path.join(SCAFFOLD_ROLE, 'vars', 'main.yml'), variables)
+    for item in variables['resource_module_directories']:
+        path = os.path.join(variables['parent_directory'], item)
+        _makedirs(path)
+        init_path = os.path.join(path, '__init__.py')
+        if not os.path.exists(init_path):
+            open(init_path, 'a').close()
+
+    cache_dir = variables['build_cache_dir']
+    if variables['build_cache']:
+        _makedirs(os.path.expanduser(cache_dir))
+
+    if variables['slim']:
+        _makedirs(os.path.join(variables['rm_dest'], 'docs'))
+
+    for template in variables['resource_module_templates']:
+        if template.get('slim_only') and not variables['slim']:
+            continue
+        destination = template['destination']
+        checksum = _checksum(destination)
+        if checksum and not template['overwrite']:
+            print("ok: %s" % destination)
+            continue
+
+        source = os.path.join(TEMPLATES_DIR, template['source'])
+        build_key = filters['build_key'](rm, source, variables['build_vars'])
+        if variables['build_cache'] and checksum:
+            record = filters['build_record'](destination, cache_dir)
+            unchanged = record.get('checksum') == checksum
+            if record.get('key') == build_key and unchanged:
+                print("ok: %s" % destination)
+                continue
+
+        variables['template'] = template
+        data = to_bytes(env.get_template(template['source']).render(variables))
+        changed = _write(destination, data)
+        print("%s: %s" % ('changed' if changed else 'ok', destination))
+
+        if variables['build_cache']:
+            with open(filters['build_record_path'](destination, cache_dir),
+                      'w') as fileh:
+                json.dump({'key': build_key,
+                           'checksum': hashlib.sha1(data).hexdigest()}, fileh)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command')
+    build_parser = subparsers.add_parser(
+        'build', help='build the resource module files for a model')
+    build_parser.add_argument('--model', required=True,
+                              help='the path to the model file')
+    build_parser.add_argument('--rm-dest', required=True,
+                              help='the directory in which the files and'
+                                   ' directories should be placed')
+    build_parser.add_argument('--structure', required=True,
+                              choices=['role', 'collection'],
+                              help='the directory layout to be generated')
+    build_parser.add_argument('--collection-org',
+                              help='the organization of the collection')
+    build_parser.add_argument('--collection-name',
+                              help='the name of the collection')
+    build_parser.add_argument('--no-build-cache', dest='build_cache',
+                              action='store_false',
+                              help='rebuild every file')
+    build_parser.add_argument('--slim', action='store_true',
+                              help='build the resource modules with only the'
+                                   ' module_utils they use and their'
+                                   ' documentation in docs')
+    args = parser.parse_args()
+    if args.command != 'build':
+        parser.print_help()
+        return 2
+
+    try:
+        build(args)
+    except (AnsibleError, IOError, OSError) as err:
+        print("ERROR: %s" % err, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 Ansible Project
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Benchmark a resource module generated by the resource module builder
+
+Each phase of the facts and of the commands is timed with the synthetic
+configuration of an increasing number of resource instances:
+
+    python rmb_tests/benchmark.py --role rmb_tests/roles/my_role \\
+                                  --network-os myos --resource interfaces
+
+A role imports ansible.module_utils.network, which only ansible 2.9 has.
+With ansible-core, benchmark a collection with --collection, the role is
+then the directory of the collection and the ansible.netcommon collection
+is imported from the collections path.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type  # pylint: disable=C0103
+
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import time
+
+# the exit status of a benchmark that cannot import the resource, distinct
+# from success so that a gate does not pass without running, 0 with
+# --allow-skip
+SKIPPED = 77
+
+try:
+    import tracemalloc
+    HAS_TRACEMALLOC = True
+except ImportError:
+    HAS_TRACEMALLOC = False
+
+STATES = ('merged', 'replaced', 'overridden', 'deleted')
+
+
+class BenchmarkModule(object):
+    """ The module for the resource classes, the params without a connection
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self.check_mode = True
+        self._diff = False
+
+    @staticmethod
+    def fail_json(**kwargs):
+        raise RuntimeError(kwargs.get('msg'))
+
+
+class ResourceImportError(Exception):
+    """ The modules of the resource cannot be imported with the ansible
+        installed
+    """
+
+
+def network_paths(role, collection=None):
+    """ Make the module_utils of the role, or of the collection, importable
+
+    :param role: The directory of the role or of the collection
+    :param collection: The name of the collection, org.name, None for a role
+    :rtype: tuple
+    :returns: The import path of the network module_utils of the role and
+              that of the network module_utils of ansible or netcommon
+    """
+    role = os.path.abspath(role)
+    if collection is None:
+        try:
+            import ansible.module_utils.network as network
+        except ImportError:
+            raise ResourceImportError(
+                'a role imports ansible.module_utils.network, which the'
+                ' installed ansible-core does not have, use ansible 2.9 or'
+                ' build a collection and use --collection')
+        network.__path__.append(os.path.join(role, 'module_utils',
+                                             'network'))
+        return 'ansible.module_utils.network', 'ansible.module_utils.network'
+
+    parts = role.split(os.sep)
+    if parts[-3:] != ['ansible_collections'] + collection.split('.'):
+        raise ResourceImportError(
+            'the collection %s should be in ansible_collections/%s, not %s'
+            % (collection, collection.replace('.', '/'), role))
+    sys.path.insert(0, os.sep.join(parts[:-3]) or os.sep)
+    # the installed collections, without the collection loader of ansible
+    from ansible import constants as C
+    sys.path.extend(os.path.expanduser(path)
+                    for path in C.COLLECTIONS_PATHS or [])
+    try:
+        importlib.import_module(
+            'ansible_collections.ansible.netcommon.plugins.module_utils')
+    except ImportError:
+        raise ResourceImportError(
+            'the ansible.netcommon collection is not installed, a collection'
+            ' imports its module_utils')
+    return ('ansible_collections.%s.plugins.module_utils.network'
+            % collection,
+            'ansible_collections.ansible.netcommon.plugins.module_utils'
+            '.network')
+
+
+def load_resource(role, network_os, resource, collection=None):
+    """ Import the modules of the resource from the role or the collection
+
+    :rtype: dict
+    :returns: The argspec, config, facts and parsers modules of the resource,
+              the network module_utils of ansible or netcommon, and the
+              emulator of the network os, which generates the configuration
+    """
+    network, common = network_paths(role, collection)
+    if collection is None:
+        plugins = os.path.join(role, 'connection_plugins')
+    else:
+        plugins = os.path.join(role, 'plugins', 'connection')
+    sys.path.insert(0, os.path.abspath(plugins))
+    modules = {}
+    try:
+        modules['emulator'] = importlib.import_module('%s_emulator'
+                                                      % network_os)
+        for name in ('argspec', 'config', 'facts', 'parsers'):
+            modules[name] = importlib.import_module(
+                '%s.%s.%s.%s.%s' % (network, network_os, name, resource,
+                                    resource))
+        modules['utils'] = importlib.import_module(
+            '%s.%s.utils.rmb_helpers' % (network, network_os))
+        modules['common'] = importlib.import_module('%s.common' % common)
+    except ImportError as exc:
+        raise ResourceImportError('the modules of %s_%s cannot be imported:'
+                                  ' %s' % (network_os, resource, exc))
+    return modules
+
+
+def skip(reason, allow_skip=False):
+    """ Report that the resource cannot be imported
+
+    :param reason: Why the resource cannot be imported
+    :param allow_skip: Whether skipping is a success
+    :rtype: int
+    :returns: The exit status, SKIPPED unless skipping is allowed
+    """
+    print('SKIPPED: %s' % reason, file=sys.stderr)
+    return 0 if allow_skip else SKIPPED
+
+
+def _run(func, repeat, memory):
+    """ Run a phase, the best of repeat runs and the peak memory of a run
+
+    :rtype: tuple
+    :returns: The result, the elapsed seconds and the peak bytes, None if
+              not measured
+    """
+    elapsed = None
+    for _count in range(repeat):
+        start = time.time()
+        result = func()
+        run_time = time.time() - start
+        if elapsed is None or run_time < elapsed:
+            elapsed = run_time
+    peak = None
+    if memory and HAS_TRACEMALLOC:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def benchmark(modules, resource, size, repeat, memory):
+    """ Time each phase for the configuration of size instances
+
+    :rtype: dict
+    :returns: The elapsed seconds and the peak bytes of each phase
+    """
+    parsers = modules['parsers']
+    facts_cls = getattr(modules['facts'], '%sFacts' % resource.capitalize())
+    config_cls = getattr(modules['config'], resource.capitalize())
+    module = BenchmarkModule({'config': None, 'state': 'merged'})
+    synthetic_config = modules['emulator'].synthetic_config
+    data = '\n'.join(synthetic_config(parsers, size))
+    want_data = '\n'.join(synthetic_config(parsers, size, offset=1))
+    results = {}
+
+    def populate_facts():
+        ansible_facts = {'ansible_network_resources': {}}
+        facts_cls(module).populate_facts(None, ansible_facts, data)
+        return ansible_facts['ansible_network_resources'].get(resource, [])
+
+    def render_config():
+        inst = facts_cls(module)
+        return [inst.render_config(conf).to_dict()
+                for conf in parsers.split_config(data)]
+
+    have, results['populate_facts'] = _timed(populate_facts, repeat, memory)
+    objs, results['render_config'] = _timed(render_config, repeat, memory)
+    _result, results['validation'] = _timed(
+        lambda: modules['argspec'].normalize_config(objs), repeat, memory)
+
+    want = facts_cls(module).validate_config(
+        [parsers.parse_config(conf).to_dict()
+         for conf in parsers.split_config(want_data)])
+    for state in STATES:
+        # the connection of the config class is not used by set_config
+        inst = config_cls.__new__(config_cls)
+        inst._module = BenchmarkModule({'config': want, 'state': state})
+        _result, results['set_config_%s' % state] = _timed(
+            lambda: inst.set_config(have), repeat, memory)
+    return results
+
+
+def _timed(func, repeat, memory):
+    result, elapsed, peak = _run(func, repeat, memory)
+    return result, {'elapsed': elapsed, 'peak': peak}
+
+
+def scaling_exponent(points):
+    """ The exponent of the elapsed time in the size, the slope of the least
+        squares fit of log(elapsed) on log(size) of the largest sizes
+
+    :param points: The size and the elapsed seconds for each size
+    :rtype: float
+    :returns: The exponent, None with fewer than two sizes
+    """
+    points = [(math.log(size), math.log(max(elapsed, 1e-9)))
+              for size, elapsed in sorted(points)[-3:]]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _y in points) / len(points)
+    mean_y = sum(y for _x, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _y in points)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    return cov / var_x
+
+
+def report(results, baseline, tolerance, max_exponent):
+    """ Print the results and check them against the baseline and the
+        scaling exponent
+
+    :rtype: list
+    :returns: The failures
+    """
+    failures = []
+    phases = sorted(results[min(results)])
+    print('%-22s %8s %10s %14s %10s' % ('phase', 'size', 'seconds',
+                                        'instances/s', 'peak KiB'))
+    for phase in phases:
+        points = []
+        for size in sorted(results):
+            entry = results[size][phase]
+            throughput = size / max(entry['elapsed'], 1e-9)
+            entry['throughput'] = throughput
+            points.append((size, entry['elapsed']))
+            peak = ('%10d' % (entry['peak'] // 1024)
+                    if entry['peak'] is not None else '%10s' % '-')
+            print('%-22s %8d %10.4f %14.0f %s' % (phase, size,
+                                                  entry['elapsed'],
+                                                  throughput, peak))
+
+            previous = baseline.get(str(size), {}).get(phase)
+            minimum = previous and previous['throughput'] * (1 - tolerance)
+            if previous and throughput < minimum:
+                failures.append('%s with %d instances: %.0f instances/s, the'
+                                ' baseline is %.0f' % (phase, size, throughput,
+                                                       previous['throughput']))
+
+        exponent = scaling_exponent(points)
+        if exponent is not None:
+            print('%-22s scaling exponent %.2f' % (phase, exponent))
+            if exponent > max_exponent:
+                failures.append('%s scales with an exponent of %.2f, more'
+                                ' than %.2f' % (phase, exponent, max_exponent))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--role', required=True,
+                        help='the role generated by the resource module'
+                             ' builder')
+    parser.add_argument('--network-os', required=True,
+                        help='the network_os of the resource')
+    parser.add_argument('--resource', required=True, help='the resource')
+    parser.add_argument('--collection',
+                        help='the name of the collection, org.name, when'
+                             ' the role is the directory of a collection')
+    parser.add_argument('--allow-skip', action='store_true',
+                        help='exit 0 instead of %d when the resource cannot'
+                             ' be imported' % SKIPPED)
+    parser.add_argument('--sizes', default='10,100,1000,10000,100000',
+                        help='the numbers of resource instances, comma'
+                             ' separated')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='the runs of each phase, the best is reported')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='do not measure the peak memory')
+    parser.add_argument('--baseline',
+                        help='the results of a previous run to compare to')
+    parser.add_argument('--save', help='save the results to a file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='the fraction of the baseline throughput that'
+                             ' may be lost')
+    parser.add_argument('--max-exponent', type=float, default=1.2,
+                        help='the largest scaling exponent of a phase')
+    args = parser.parse_args()
+
+    try:
+        modules = load_resource(args.role, args.network_os, args.resource,
+                                args.collection)
+    except ResourceImportError as exc:
+        return skip(exc, args.allow_skip)
+    results = {}
+    for size in sorted(int(size) for size in args.sizes.split(',')):
+        results[size] = benchmark(modules, args.resource, size, args.repeat,
+                                  args.memory)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as fileh:
+            baseline = json.load(fileh)
+    failures = report(results, baseline, args.tolerance, args.max_exponent)
+
+    if args.save:
+        with open(args.save, 'w') as fileh:
+            json.dump(dict((str(size), value)
+                           for size, value in results.items()),
+                      fileh, indent=2, sort_keys=True)
+
+    for failure in failures:
+        print('FAILED: %s' % failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 Ansible Project
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Check the generated helpers of a resource module against the upstream ones
+
+The facts of the resource are validated by the generated normalize_config
+and by utils.validate_config with the argspec, with the same good and bad
+values for each option. Both must accept a value, with the same result, or
+both must reject it. The subsets of the FactsBase of a slim build are
+checked against the FactsBase of the network modules:
+
+    python rmb_tests/check_helpers.py --role rmb_tests/roles/my_role \\
+                                      --network-os myos --resource interfaces
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type  # pylint: disable=C0103
+
+import argparse
+import importlib
+import io
+import itertools
+import json
+import sys
+
+from benchmark import SKIPPED, ResourceImportError, load_resource, skip
+
+# the values of each type of option, the argspec accepts some and rejects
+# the others
+VALUES = {
+    'str': ['value', 10, 1.5, True, ['value'], {'key': 'value'}],
+    'int': [10, '10', 1.0, 1.5, True, 'ten', ['10'], {'key': 10}],
+    'float': [1.5, '1.5', 10, 'one', ['1.5'], {'key': 1.5}],
+    'bool': [True, 'yes', 'off', 0, 'maybe', 2, ['yes'], {'key': True}],
+    'dict': [{}, 'key=value', '{"key": "value"}', 10, ['key']],
+    'list': [['value'], 'one,two', 10, 1.5, {'key': 'value'}],
+}
+
+# a key that is not an option
+UNKNOWN = '_not_an_option'
+
+# the subsets of the facts, valid and not, for gen_runable
+SUBSETS = ('all', 'min', 'default', 'config', 'interfaces', 'unknown')
+
+
+def _sample(option):
+    """ A value the argspec accepts for an option
+    """
+    if option.get('choices'):
+        return option['choices'][0]
+    if option.get('type') == 'dict':
+        return dict((name, _sample(suboption))
+                    for name, suboption in option.get('options', {}).items()
+                    if suboption.get('required'))
+    if option.get('type') == 'list':
+        return [_sample(dict(option, type=option.get('elements')))]
+    return VALUES[option.get('type') or 'str'][0]
+
+
+def _entry(options, path, value):
+    """ A 'config' entry with the value at the path, and a value for each of
+        the required options
+    """
+    entry = dict((name, _sample(option)) for name, option in options.items()
+                 if option.get('required'))
+    name = path[0]
+    if len(path) > 1:
+        value = _entry(options[name].get('options', {}), path[1:], value)
+    entry[name] = value
+    return entry
+
+
+def cases(options, prefix=()):
+    """ The values of each option, and an unknown key in each dictionary of
+        the options
+
+    :rtype: generator
+    :returns: The path of each option and the value
+    """
+    yield prefix + (UNKNOWN,), 'value'
+    for name in sorted(options):
+        option = options[name]
+        path = prefix + (name,)
+        if option.get('type') == 'dict' and 'options' in option:
+            for case in cases(option['options'], path):
+                yield case
+        values = list(VALUES.get(option.get('type') or 'str', []))
+        if option.get('choices'):
+            values.append('_not_a_choice')
+        for value in values:
+            yield path, value
+
+
+def validate(utils, argument_spec, objs):
+    """ Validate the facts with utils.validate_config, which fails the module
+        when they are not valid
+
+    :rtype: tuple
+    :returns: The facts validated, the error
+    """
+    stdout = sys.stdout
+    sys.stdout = io.StringIO() if sys.version_info[0] > 2 else io.BytesIO()
+    try:
+        return utils.validate_config(argument_spec,
+                                     {'config': objs})['config'], None
+    except SystemExit:
+        return None, json.loads(sys.stdout.getvalue())['msg']
+    finally:
+        sys.stdout = stdout
+
+
+def normalize(normalize_config, objs):
+    """ Validate the facts with the generated normalize_config
+
+    :rtype: tuple
+    :returns: The facts validated, the error
+    """
+    try:
+        return normalize_config(objs), None
+    except (TypeError, ValueError) as exc:
+        return None, str(exc)
+
+
+def check(modules, utils):
+    """ Check the normalizer of the resource against utils.validate_config
+
+    :rtype: list
+    :returns: The failures
+    """
+    argspec = modules['argspec']
+    args = [value for name, value in vars(argspec).items()
+            if name.endswith('Args') and hasattr(value, 'argument_spec')][0]
+    config = args.argument_spec['config']
+    failures = []
+    count = 0
+    for path, value in cases(config.get('options', {})):
+        entry = _entry(config.get('options', {}), path, value)
+        objs = [entry] if config.get('type') == 'list' else entry
+        expected, expected_error = validate(utils, args.argument_spec,
+                                            objs)
+        result, error = normalize(argspec.normalize_config, objs)
+        count += 1
+        if (expected_error is None) != (error is None):
+            failures.append('%s=%r: validate_config %s, normalize_config %s'
+                            % ('.'.join(path), value,
+                               expected_error or 'passed',
+                               error or 'passed'))
+        elif result != expected:
+            failures.append('%s=%r: validate_config %r, normalize_config %r'
+                            % ('.'.join(path), value, expected, result))
+    print('%d values checked, %d failed' % (count, len(failures)))
+    return failures
+
+
+class SubsetModule(object):
+    """ The module for the FactsBase, without a connection
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self._connection = None
+
+    @staticmethod
+    def fail_json(**kwargs):
+        raise ValueError(kwargs.get('msg'))
+
+
+def _runable(facts_base, subsets, valid_subsets, resource_facts):
+    """ The subsets a FactsBase generates, or its error
+    """
+    module = SubsetModule({})
+    facts = facts_base(module)
+    try:
+        return sorted(facts.gen_runable(subsets, valid_subsets,
+                                        resource_facts)), None
+    except ValueError as exc:
+        return None, str(exc)
+
+
+def check_subsets(facts_base, upstream):
+    """ Check gen_runable of the slim FactsBase against the FactsBase of
+        the network modules, with each pair of the subsets
+
+    :rtype: list
+    :returns: The failures
+    """
+    failures = []
+    count = 0
+    names = SUBSETS + tuple('!' + name for name in SUBSETS)
+    valid = (frozenset(['default', 'config']), frozenset(['interfaces']))
+    for size in (1, 2):
+        for subsets in itertools.permutations(names, size):
+            for valid_subsets, resource_facts in itertools.product(
+                    valid, (False, True)):
+                args = (list(subsets), valid_subsets, resource_facts)
+                expected = _runable(upstream, *args)
+                result = _runable(facts_base, *args)
+                count += 1
+                if result != expected:
+                    failures.append('gen_runable%r: FactsBase %r, slim %r'
+                                    % (args, expected, result))
+    print('%d subsets checked, %d failed' % (count, len(failures)))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--role', required=True,
+                        help='the role generated by the resource module'
+                             ' builder')
+    parser.add_argument('--network-os', required=True,
+                        help='the network_os of the resource')
+    parser.add_argument('--resource', required=True, help='the resource')
+    parser.add_argument('--collection',
+                        help='the name of the collection, org.name, when'
+                             ' the role is the directory of a collection')
+    parser.add_argument('--allow-skip', action='store_true',
+                        help='exit 0 instead of %d when the resource cannot'
+                             ' be imported' % SKIPPED)
+    args = parser.parse_args()
+
+    try:
+        modules = load_resource(args.role, args.network_os, args.resource,
+                                args.collection)
+    except ResourceImportError as exc:
+        return skip(exc, args.allow_skip)
+    common = modules['common']
+    failures = check(modules, importlib.import_module(
+        '%s.utils' % common.__name__))
+
+    helpers = modules['utils']
+    if hasattr(helpers, 'FactsBase'):
+        facts = importlib.import_module('%s.facts.facts' % common.__name__)
+        # the connection of the modules is not used by gen_runable
+        helpers.get_resource_connection = facts.get_resource_connection = (
+            lambda module: None)
+        failures.extend(check_subsets(helpers.FactsBase, facts.FactsBase))
+    else:
+        print('the subsets are checked only for a slim build')
+
+    for failure in failures:
+        print('FAILED: %s' % failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,546 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+#############################################
+#                WARNING                    #
+#############################################
+#
+# This file is auto generated by the resource
+#   module builder playbook.
+#
+# Do not edit this file manually.
+#
+# Changes to this file will be over written
+#   by the resource module builder.
+#
+# Changes should be made in the resource module
+#   builder template.
+#
+#############################################
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import pkgutil
+import re
+import time
+from collections import OrderedDict
+from importlib import import_module
+from xml.etree import ElementTree
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.six import string_types
+from ansible.plugins.connection import NetworkConnectionBase, ensure_connect
+
+DOCUMENTATION = """
+---
+author: Ansible Network Engineer
+connection: myos_emulator
+short_description: Emulate a myos device for the resource modules
+description:
+  - This connection plugin emulates a myos device, without a
+    device. The running configuration of the device is held in memory and
+    is changed by the commands of the resource modules, for the length of
+    the persistent connection.
+  - The running configuration starts as the contents of the
+    C(emulator_config) files and the synthetic configuration of
+    C(emulator_instances) instances of each resource.
+  - The configuration is read with C(show running-config), optionally
+    followed by C(| section <regex>) for the lines that match the regex and
+    the lines indented under them. C(show running-config checksum) is the
+    sha1 checksum of the configuration.
+  - The command of the STRUCTURED source of a resource is answered with the
+    JSON or XML output of the configuration of the resource.
+version_added: "2.9"
+options:
+  emulator_config:
+    type: list
+    description:
+      - The files of the running configuration the device starts with.
+    env:
+      - name: ANSIBLE_MYOS_EMULATOR_CONFIG
+    vars:
+      - name: ansible_myos_emulator_config
+  emulator_instances:
+    type: int
+    description:
+      - The number of instances of each resource in the synthetic
+        configuration the device starts with.
+    default: 0
+    env:
+      - name: ANSIBLE_MYOS_EMULATOR_INSTANCES
+    vars:
+      - name: ansible_myos_emulator_instances
+  emulator_latency:
+    type: float
+    description:
+      - The seconds the device takes to answer each request.
+    default: 0
+    env:
+      - name: ANSIBLE_MYOS_EMULATOR_LATENCY
+    vars:
+      - name: ansible_myos_emulator_latency
+  emulator_command_latency:
+    type: float
+    description:
+      - The seconds the device takes for each command of a configuration
+        change, in addition to C(emulator_latency).
+    default: 0
+    env:
+      - name: ANSIBLE_MYOS_EMULATOR_COMMAND_LATENCY
+    vars:
+      - name: ansible_myos_emulator_command_latency
+  persistent_connect_timeout:
+    type: int
+    description:
+      - Configures, in seconds, the amount of time to wait when trying to
+        initially establish a persistent connection.
+    default: 30
+    ini:
+      - section: persistent_connection
+        key: connect_timeout
+    env:
+      - name: ANSIBLE_PERSISTENT_CONNECT_TIMEOUT
+    vars:
+      - name: ansible_connect_timeout
+  persistent_command_timeout:
+    type: int
+    description:
+      - Configures, in seconds, the amount of time to wait for a command to
+        return from the emulated device.
+    default: 30
+    ini:
+      - section: persistent_connection
+        key: command_timeout
+    env:
+      - name: ANSIBLE_PERSISTENT_COMMAND_TIMEOUT
+    vars:
+      - name: ansible_command_timeout
+  persistent_log_messages:
+    type: boolean
+    description:
+      - This flag will enable logging the command executed and response
+        received from the emulated device in the ansible log file.
+    default: False
+    ini:
+      - section: persistent_connection
+        key: log_messages
+    env:
+      - name: ANSIBLE_PERSISTENT_LOG_MESSAGES
+    vars:
+      - name: ansible_persistent_log_messages
+"""
+
+# the parsers of each resource of the network os are in this package
+PARSERS_PACKAGE = ('ansible.module_utils.network.'
+                   'myos.parsers')
+
+# the module_utils of the role, the plugins of a role do not find them
+ROLE_NETWORK_UTILS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'module_utils', 'network')
+
+RUNNING_CONFIG_COMMAND = 'show running-config'
+
+CHECKSUM_COMMAND = 'show running-config checksum'
+
+SECTION_RE = re.compile(r'^%s\s*\|\s*section\s+(.+)$'
+                        % re.escape(RUNNING_CONFIG_COMMAND))
+
+# the indent of the lines of a resource instance, in the synthetic
+# configuration and for the commands applied
+INDENT = '  '
+
+
+def _merge(base, other):
+    """ Merge the structured output of a resource into that of the others
+    """
+    for key, value in other.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        elif isinstance(value, list) and isinstance(base.get(key), list):
+            base[key].extend(value)
+        else:
+            base[key] = value
+    return base
+
+
+def _element(parent, tag, value):
+    """ Add the structured output to an XML element, an element for each
+        key of a dictionary and for each item of a list
+    """
+    for item in value if isinstance(value, list) else [value]:
+        element = ElementTree.SubElement(parent, tag)
+        if isinstance(item, dict):
+            for key, child in item.items():
+                _element(element, key, child)
+        else:
+            element.text = to_text(item)
+
+
+def _argspec(parsers):
+    """ The argspec module of the resource of the parsers
+    """
+    return import_module(parsers.__name__.replace('.parsers.', '.argspec.', 1))
+
+
+def _synthetic_value(argspec, parser, index, offset):
+    """ A value for the option of a parser, for a resource instance
+    """
+    key = argspec.RESOURCE_KEY
+    if parser['path'] == (key,):
+        if parser['type'] == 'int':
+            return index
+        return '%s%d' % (key, index)
+    index += offset
+    option = argspec.OPTION_INDEX.get('.'.join(parser['path']), {})
+    choices = option.get('choices')
+    if choices:
+        return choices[index % len(choices)]
+    if parser['values'] is not None:
+        values = [parser['values'][text] for text in sorted(parser['values'])]
+        return values[index % len(values)]
+    if parser['type'] == 'int':
+        return index
+    if parser['type'] == 'float':
+        return index + 0.5
+    return 'value%d' % index
+
+
+def synthetic_config(parsers, count, offset=0):
+    """ Generate the configuration of resource instances, rendered with the
+        setval of each parser, the options of an instance are indented after
+        the command for its RESOURCE_KEY
+
+    :param parsers: The parsers module of the resource
+    :param count: The number of instances
+    :param offset: Offsets the values of the options other than the key, for
+                   a configuration that differs from that of offset 0
+    :rtype: generator
+    :returns: Each of the lines of the configuration
+    """
+    argspec = _argspec(parsers)
+    path = (argspec.RESOURCE_KEY,)
+    keys = [parser for parser in parsers.PARSERS if parser['path'] == path]
+    options = [parser for parser in parsers.PARSERS if parser['path'] != path]
+    indent = INDENT if keys else ''
+    for index in range(count):
+        for parser in keys:
+            value = _synthetic_value(argspec, parser, index, offset)
+            yield parsers.render_command(parser['path'], value)
+        for parser in options:
+            value = _synthetic_value(argspec, parser, index, offset)
+            yield indent + parsers.render_command(parser['path'], value)
+
+
+def structured_config(parsers, data):
+    """ The structured output of the STRUCTURED command for a configuration,
+        as nested dictionaries and lists, the output of each instance has
+        the value of each field at its path
+
+    :param parsers: The parsers module of the resource
+    :param data: The configuration, or an iterable of its lines
+    :rtype: dictionary
+    :returns: The output, None without a STRUCTURED source
+    """
+    structured = parsers.STRUCTURED
+    if structured is None:
+        return None
+    instances = []
+    for conf in parsers.split_config(data):
+        config = parsers.parse_config(conf).to_dict()
+        node = {}
+        for field in structured['fields']:
+            value = config
+            for key in field['option']:
+                value = value.get(key) if isinstance(value, dict) else None
+            if value is None:
+                continue
+            if field['texts'] is not None:
+                if field['list']:
+                    value = [field['texts'].get(item, item) for item in value]
+                else:
+                    value = field['texts'].get(value, value)
+            tree = node
+            for key in field['path'][:-1]:
+                tree = tree.setdefault(key, {})
+            tree[field['path'][-1]] = value
+        instances.append(node)
+    result = tree = {}
+    for key in structured['instances'][:-1]:
+        tree = tree.setdefault(key, {})
+    tree[structured['instances'][-1]] = instances
+    return result
+
+
+def load_parsers():
+    """ Import the parsers of each resource of the network os
+
+    :rtype: list
+    :returns: The parsers module of each resource
+    """
+    import ansible.module_utils.network as network
+    if ROLE_NETWORK_UTILS not in network.__path__:
+        network.__path__.append(ROLE_NETWORK_UTILS)
+    package = import_module(PARSERS_PACKAGE)
+    parsers = []
+    for _finder, name, is_package in pkgutil.iter_modules(package.__path__):
+        if is_package:
+            parsers.append(import_module('%s.%s.%s' % (PARSERS_PACKAGE, name,
+                                                       name)))
+    return parsers
+
+
+class RunningConfig(object):
+    """ The running configuration of the emulated device, each line that is
+        not indented and the lines indented under it. The commands of a
+        change are applied with the parsers of the resource the line of the
+        instance belongs to, a command replaces the line of the instance
+        with the same parser
+    """
+
+    def __init__(self, parsers=()):
+        self._parsers = list(parsers)
+        self._sections = OrderedDict()
+
+    def load(self, lines):
+        """ Add the lines of a configuration
+
+        :param lines: The configuration, or an iterable of its lines
+        """
+        if isinstance(lines, string_types):
+            lines = lines.splitlines()
+        current = None
+        for line in lines:
+            line = line.rstrip()
+            if not line.strip():
+                continue
+            if line[0].isspace() and current is not None:
+                current.append(line)
+            else:
+                current = self._sections.setdefault(line, [])
+
+    def load_synthetic(self, count):
+        """ Add the synthetic configuration of each resource
+
+        :param count: The number of instances of each resource
+        """
+        for parsers in self._parsers:
+            self.load(synthetic_config(parsers, count))
+
+    def get(self, regex=None):
+        """ The running configuration
+
+        :param regex: Only the lines that match and the lines under them
+        :rtype: str
+        """
+        lines = []
+        for line, children in self._sections.items():
+            if regex is None or regex.search(line):
+                lines.append(line)
+                lines.extend(children)
+        return '\n'.join(lines)
+
+    def structured(self, command):
+        """ The output of the resources with the command as their STRUCTURED
+            source
+
+        :param command: The command
+        :rtype: str
+        :returns: The JSON or XML output, None if no resource has the command
+        """
+        result = output_format = None
+        for parsers in self._parsers:
+            structured = getattr(parsers, 'STRUCTURED', None)
+            if structured is None or structured['command'] != command:
+                continue
+            config = structured_config(parsers, self.get())
+            result = _merge(result or {}, config)
+            output_format = structured['format']
+        if result is None:
+            return None
+        if output_format == 'xml':
+            root = ElementTree.Element('rpc-reply')
+            for key, value in result.items():
+                _element(root, key, value)
+            return to_text(ElementTree.tostring(root))
+        return json.dumps(result, sort_keys=True)
+
+    def _resource(self, line):
+        for parsers in self._parsers:
+            delimiter = parsers.RESOURCE_DELIMITER
+            if delimiter is not None and delimiter.match(line):
+                return parsers
+        return None
+
+    @staticmethod
+    def _parser(parsers, line):
+        if parsers is None or parsers.PARSER is None:
+            return None
+        match = parsers.PARSER.match(line)
+        return match.lastindex if match else None
+
+    def _set(self, parsers, children, line):
+        group = self._parser(parsers, line)
+        if group is not None and not parsers.DISPATCH[group]['list']:
+            children[:] = [child for child in children
+                           if self._parser(parsers, child) != group]
+        if line not in children:
+            children.append(line)
+
+    def _unset(self, parsers, children, line):
+        remaining = [child for child in children
+                     if child.strip() != line.strip()]
+        if len(remaining) == len(children):
+            group = self._parser(parsers, line)
+            if group is not None:
+                remaining = [child for child in children
+                             if self._parser(parsers, child) != group]
+        children[:] = remaining
+
+    def apply(self, commands):
+        """ Apply the commands of a change, a command that starts a resource
+            instance, or that is not indented outside of an instance, is
+            followed by the commands for the instance
+
+        :param commands: The commands
+        """
+        context = parsers = None
+        for command in commands:
+            command = command.rstrip()
+            if not command.strip():
+                continue
+            if command.strip() in ('exit', 'end'):
+                context = parsers = None
+                continue
+            negate = command.lstrip().startswith('no ')
+            body = command.lstrip()[3:] if negate else command.lstrip()
+
+            if context is not None:
+                line = INDENT + body
+                option = self._parser(parsers, line)
+                if option is not None or not self._resource(body):
+                    if negate:
+                        self._unset(parsers, self._sections[context], line)
+                    else:
+                        self._set(parsers, self._sections[context], line)
+                    continue
+
+            if negate:
+                self._sections.pop(body, None)
+                context = parsers = None
+            else:
+                self._sections.setdefault(body, [])
+                context, parsers = body, self._resource(body)
+
+
+class Connection(NetworkConnectionBase):
+    """ Emulates a myos device, the running configuration is held
+        by the persistent connection
+    """
+
+    transport = 'myos_emulator'
+    has_pipelining = False
+
+    def __init__(self, play_context, new_stdin, *args, **kwargs):
+        super(Connection, self).__init__(play_context, new_stdin, *args,
+                                         **kwargs)
+        self._running_config = None
+
+    def _connect(self):
+        if self.connected:
+            return
+        running_config = RunningConfig(load_parsers())
+        for path in self.get_option('emulator_config') or []:
+            try:
+                with open(os.path.expanduser(path)) as fileh:
+                    running_config.load(fileh.read())
+            except (IOError, OSError) as exc:
+                raise AnsibleConnectionFailure(
+                    'unable to read the emulator configuration %s: %s'
+                    % (path, to_text(exc)))
+        running_config.load_synthetic(self.get_option('emulator_instances'))
+        self._running_config = running_config
+        self.queue_message('vvvv', 'emulating a myos device for %s'
+                           % self._play_context.remote_addr)
+        self._connected = True
+
+    def close(self):
+        self._running_config = None
+        super(Connection, self).close()
+
+    def _wait(self, commands=0):
+        command_latency = self.get_option('emulator_command_latency')
+        latency = self.get_option('emulator_latency')
+        latency += command_latency * commands
+        if latency > 0:
+            time.sleep(latency)
+
+    @ensure_connect
+    def get(self, command=None, *args, **kwargs):
+        """ The running configuration, the sections of it that match the
+            regex of C(| section <regex>), its checksum, or the structured
+            output of the resources
+        """
+        self._wait()
+        command = (command or '').lstrip()
+        if command.strip() == RUNNING_CONFIG_COMMAND:
+            return self._running_config.get()
+        if command.strip() == CHECKSUM_COMMAND:
+            config = to_bytes(self._running_config.get())
+            return hashlib.sha1(config).hexdigest()
+        match = SECTION_RE.match(command)
+        if match:
+            return self._running_config.get(re.compile(match.group(1)))
+        structured = self._running_config.structured(command.strip())
+        if structured is not None:
+            return structured
+        raise AnsibleConnectionFailure("the emulated device has no command"
+                                       " '%s'" % command)
+
+    @ensure_connect
+    def edit_config(self, candidate=None, commit=True, replace=None,
+                    diff=False, comment=None):
+        """ Apply the commands to the running configuration
+        """
+        if isinstance(candidate, string_types):
+            candidate = candidate.splitlines()
+        candidate = list(candidate or [])
+        self._wait(len(candidate))
+        self._running_config.apply(candidate)
+        return {'request': candidate, 'response': [''] * len(candidate)}
+
+    def get_device_info(self):
+        return {
+            'network_os': 'myos',
+            'network_os_platform': 'emulator',
+        }
+
+    def get_capabilities(self):
+        return json.dumps({
+            'rpc': ['get', 'edit_config', 'get_capabilities',
+                    'get_device_info'],
+            'network_api': 'cliconf',
+            'device_info': self.get_device_info(),
+            'device_operations': {
+                'supports_diff_replace': False,
+                'supports_commit': False,
+                'supports_rollback': False,
+                'supports_defaults': False,
+                'supports_onbox_diff': False,
+                'supports_generate_diff': False,
+                'supports_multiline_delimiter': False,
+                'supports_diff_match': False,
+                'supports_diff_ignore_lines': False,
+                'supports_config_replace': False,
+                'supports_admin': False,
+                'supports_commit_label': False,
+            },
+        })
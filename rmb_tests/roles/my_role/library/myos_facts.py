@@ -12,7 +12,7 @@ __metaclass__ = type
 
 
 ANSIBLE_METADATA = {'metadata_version': '1.1',
-                    'status': [u'preview'],
+                    'status': ['preview'],
                     'supported_by': '<support_group>'}
 
 
@@ -84,6 +84,15 @@ See the respective resource module parameters for the tree.
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.myos.argspec.facts.facts import FactsArgs
 from ansible.module_utils.network.myos.facts.facts import Facts
+from ansible.module_utils.network.myos.utils.rmb_helpers import perf_recorder
+
+# AnsiballZ packs only the module_utils imported in the source and does not
+# see the import_module of Facts, this block never runs, it only adds the
+# facts class of each resource to the module payload
+if False:  # pylint: disable=W0125
+    from ansible.module_utils.network.myos.facts.interfaces.interfaces import (  # noqa: E501,F401
+        InterfacesFacts,
+    )
 
 
 def main():
@@ -102,7 +111,11 @@ def main():
     ansible_facts, additional_warnings = result
     warnings.extend(additional_warnings)
 
-    module.exit_json(ansible_facts=ansible_facts, warnings=warnings)
+    result = dict(ansible_facts=ansible_facts, warnings=warnings)
+    perf = perf_recorder(module)
+    if perf.enabled:
+        result['perf'] = perf.results()
+    module.exit_json(**result)
 
 
 if __name__ == '__main__':
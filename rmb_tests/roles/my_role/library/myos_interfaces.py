@@ -182,6 +182,9 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.myos.argspec.interfaces.interfaces import InterfacesArgs
 from ansible.module_utils.network.myos.config.interfaces.interfaces import Interfaces
+from ansible.module_utils.network.myos.utils.rmb_helpers import (
+    user_argument_spec,
+)
 
 
 def main():
@@ -190,7 +193,11 @@ def main():
 
     :returns: the result form module invocation
     """
-    module = AnsibleModule(argument_spec=InterfacesArgs.argument_spec,
+    # the defaults of the options of 'config' are not given to the module,
+    # the commands are generated only for the options the user set. The
+    # defaults documented for them are those of the device, not applied here
+    argument_spec = user_argument_spec(InterfacesArgs.argument_spec)
+    module = AnsibleModule(argument_spec=argument_spec,
                            supports_check_mode=True)
 
     result = Interfaces(module).execute_module()
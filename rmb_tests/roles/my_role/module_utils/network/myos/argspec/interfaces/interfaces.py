@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#
 # -*- coding: utf-8 -*-
 # Copyright 2019 Red Hat
 # GNU General Public License v3.0+
@@ -25,6 +25,7 @@
 """
 The arg spec for the myos_interfaces module
 """
+from ansible.module_utils.network.myos.utils import rmb_helpers
 
 
 class InterfacesArgs(object):  # pylint: disable=R0903
@@ -49,3 +50,157 @@ class InterfacesArgs(object):  # pylint: disable=R0903
  'state': {'choices': ['merged', 'replaced', 'overridden', 'deleted'],
            'default': 'merged',
            'type': 'str'}}  # pylint: disable=C0301
+
+
+# The empty facts tree of a single 'config' entry, generated from the
+# argument_spec, treat it as read-only and use new_facts() for a facts tree
+# to populate
+FACTS_SKELETON = {'name': None,
+                  'some_bool': None,
+                  'some_dict': {'property_01': None},
+                  'some_int': None,
+                  'some_string': 'choice_a'}  # pylint: disable=C0301
+
+# Each of the 'config' suboptions, keyed by its dotted path
+OPTION_INDEX = {'name': {'type': 'str'},
+                'some_bool': {'type': 'bool'},
+                'some_dict': {'type': 'dict'},
+                'some_dict.property_01': {'type': 'str'},
+                'some_int': {'type': 'int'},
+                'some_string': {'choices': ['choice_a',
+                                            'choice_b',
+                                            'choice_c'],
+                                'default': 'choice_a',
+                                'type': 'str'}}  # pylint: disable=C0301
+
+# The 'config' suboption that identifies a resource instance
+RESOURCE_KEY = 'name'
+
+
+def new_facts():
+    """ A new facts tree, the same as FACTS_SKELETON without copying it
+    """
+    return {'name': None,
+            'some_bool': None,
+            'some_dict': {'property_01': None},
+            'some_int': None,
+            'some_string': 'choice_a'}  # pylint: disable=C0301
+
+
+# The record classes of the facts tree of a 'config' entry, the slots use
+# less memory than a dict for each resource instance, the facts class holds
+# the records of all of the instances until they are parsed and converts
+# each to a dict only then
+class ConfigRecord(object):
+    """ A record of config, the same as its facts tree
+    """
+    __slots__ = ('name', 'some_bool', 'some_dict', 'some_int', 'some_string')
+
+    def __init__(self):
+        self.name = None
+        self.some_bool = None
+        self.some_dict = ConfigSomeDictRecord()
+        self.some_int = None
+        self.some_string = 'choice_a'
+
+    def to_dict(self):
+        """ The facts tree of the record, without the empty values
+        """
+        result = {}
+        value = self.name
+        if value not in rmb_helpers.EMPTY_VALUES:
+            result['name'] = value
+        value = self.some_bool
+        if value not in rmb_helpers.EMPTY_VALUES:
+            result['some_bool'] = value
+        value = self.some_dict.to_dict()
+        if value not in rmb_helpers.EMPTY_VALUES:
+            result['some_dict'] = value
+        value = self.some_int
+        if value not in rmb_helpers.EMPTY_VALUES:
+            result['some_int'] = value
+        value = self.some_string
+        if value not in rmb_helpers.EMPTY_VALUES:
+            result['some_string'] = value
+        return result
+
+
+class ConfigSomeDictRecord(object):
+    """ A record of config.some_dict, the same as its facts tree
+    """
+    __slots__ = ('property_01',)
+
+    def __init__(self):
+        self.property_01 = None
+
+    def to_dict(self):
+        """ The facts tree of the record, without the empty values
+        """
+        result = {}
+        value = self.property_01
+        if value not in rmb_helpers.EMPTY_VALUES:
+            result['property_01'] = value
+        return result
+
+
+# The validation and normalization of the facts of the 'config' option,
+# generated from the argument_spec
+def normalize_config(config):
+    """ Validate and normalize the facts of the 'config' option, the same as
+        utils.validate_config with the argument_spec
+    """
+    return [_normalize_config(entry)
+            for entry in rmb_helpers.check_list(config, 'config')]
+
+
+def _normalize_config(entry):
+    """ Normalize config
+    """
+    entry = rmb_helpers.check_dict(entry, 'config')
+    rmb_helpers.check_keys(entry,
+                           ('name',
+                            'some_bool',
+                            'some_dict',
+                            'some_int',
+                            'some_string'),
+                           'config')
+    result = {}
+    value = entry.get('name')
+    if value is not None:
+        value = rmb_helpers.check_str(value, 'config.name')
+    result['name'] = value
+    value = entry.get('some_bool')
+    if value is not None:
+        value = rmb_helpers.check_bool(value, 'config.some_bool')
+    result['some_bool'] = value
+    value = entry.get('some_dict')
+    if value is not None:
+        value = _normalize_config_some_dict(value)
+    result['some_dict'] = value
+    value = entry.get('some_int')
+    if value is not None:
+        value = rmb_helpers.check_int(value, 'config.some_int')
+    result['some_int'] = value
+    value = entry.get('some_string')
+    if value is None:
+        value = 'choice_a'
+    if value is not None:
+        value = rmb_helpers.check_str(value, 'config.some_string')
+    rmb_helpers.check_choices(value,
+                              ['choice_a', 'choice_b', 'choice_c'],
+                              'config.some_string')
+    result['some_string'] = value
+    return result
+
+
+def _normalize_config_some_dict(entry):
+    """ Normalize config.some_dict
+    """
+    entry = rmb_helpers.check_dict(entry, 'config.some_dict')
+    rmb_helpers.check_keys(entry, ('property_01',), 'config.some_dict')
+    result = {}
+    value = entry.get('property_01')
+    if value is not None:
+        value = rmb_helpers.check_str(value, 'config.some_dict.property_01')
+    result['property_01'] = value
+    return result
@@ -10,9 +10,33 @@ is compared to the provided configuration (as dict) and the command set
 necessary to bring the current configuration to it's desired end-state is
 created
 """
+import time
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.connection import ConnectionError
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
+from ansible.module_utils.network.myos.argspec.interfaces.interfaces import (
+    OPTION_INDEX,
+    RESOURCE_KEY,
+    normalize_config,
+)
 from ansible.module_utils.network.myos.facts.facts import Facts
+from ansible.module_utils.network.myos.facts.interfaces.interfaces import (
+    InterfacesFacts,
+)
+from ansible.module_utils.network.myos.parsers.interfaces.interfaces import (
+    render_command,
+)
+from ansible.module_utils.network.myos.utils.rmb_helpers import (
+    batch_commands,
+    compute_after,
+    facts_cache,
+    index_config,
+    perf_recorder,
+    set_options,
+    unset_options,
+)
 
 
 class Interfaces(ConfigBase):
@@ -29,16 +53,48 @@ class Interfaces(ConfigBase):
         'interfaces',
     ]
 
+    # read the configuration from the device again for 'after', instead of
+    # computing it from 'before', the desired configuration and the commands
+    verify_after = False
+
+    # the most commands and bytes of commands sent to the device with each
+    # edit_config, None for no limit, and whether the commands of a resource
+    # instance are kept within a single edit_config. When they are not, the
+    # command for the instance starts each edit_config with its commands
+    max_batch_commands = None
+    max_batch_bytes = None
+    batch_by_instance = True
+
+    # the most commands returned in 'commands', None for all of them, the
+    # commands are generated for each resource instance as they are sent
+    max_echoed_commands = None
+
+    # the states that change only the resource instances in 'config', the
+    # configuration of only those instances is read from the device when
+    # there are at most max_scoped_instances of them
+    scoped_states = ('merged', 'replaced', 'deleted')
+    max_scoped_instances = 50
+
     def __init__(self, module):
         super(Interfaces, self).__init__(module)
+        # only the facts of the resource are imported
+        self._facts = Facts(module, {'interfaces': InterfacesFacts})
+        self._perf = perf_recorder(module)
 
-    def get_interfaces_facts(self):
+    def get_interfaces_facts(self, names=None):
         """ Get the 'facts' (the current configuration)
 
+        :param names: The RESOURCE_KEY of the instances to read, all of the
+                      instances when None
         :rtype: A dictionary
         :returns: The current configuration as a dictionary
         """
-        facts, _warnings = Facts(self._module).get_facts(self.gather_subset, self.gather_network_resources)
+        data = None
+        if names is not None:
+            resource_facts = InterfacesFacts(self._module)
+            data = resource_facts.get_instances(self._connection, names)
+        facts, _warnings = self._facts.get_facts(
+            self.gather_subset, self.gather_network_resources, data)
         interfaces_facts = facts['ansible_network_resources'].get('interfaces')
         if not interfaces_facts:
             return []
@@ -51,103 +107,309 @@ class Interfaces(ConfigBase):
         :returns: The result from module execution
         """
         result = {'changed': False}
-        commands = list()
         warnings = list()
+        commands = list()
+        counts = {'commands': 0, 'bytes': 0}
 
-        existing_interfaces_facts = self.get_interfaces_facts()
-        commands.extend(self.set_config(existing_interfaces_facts))
-        if commands:
-            if not self._module.check_mode:
-                self._connection.edit_config(commands)
+        names = self.scoped_names()
+        existing_interfaces_facts = self.get_interfaces_facts(names)
+        # the commands of each instance are generated as they are sent
+        groups = self.set_config(existing_interfaces_facts, grouped=True)
+        groups = self.echo_commands(self._perf.iterate('diff', groups),
+                                    commands, counts)
+        if self._module.check_mode:
+            for _group in groups:
+                pass
+        else:
+            batches = self.push_commands(groups)
+            if batches:
+                self._perf.count('edit_config', commands=counts['commands'],
+                                 bytes=counts['bytes'], batches=len(batches))
+                if self.max_batch_commands or self.max_batch_bytes:
+                    result['batches'] = batches
+        self._perf.count('diff', commands=counts['commands'])
+        if counts['commands']:
             result['changed'] = True
         result['commands'] = commands
-
-        changed_interfaces_facts = self.get_interfaces_facts()
+        if counts['commands'] > len(commands):
+            result['omitted_commands'] = counts['commands'] - len(commands)
+        count = counts['commands']
 
         result['before'] = existing_interfaces_facts
         if result['changed']:
-            result['after'] = changed_interfaces_facts
+            with self._perf.phase('after'):
+                if self.verify_after and not self._module.check_mode:
+                    result['after'] = self.get_interfaces_facts(names)
+                else:
+                    result['after'] = self.compute_after(
+                        existing_interfaces_facts, count)
 
         result['warnings'] = warnings
+        if self._perf.enabled:
+            result['perf'] = self._perf.results()
         return result
 
-    def set_config(self, existing_interfaces_facts):
+    def compute_after(self, existing_interfaces_facts, commands):
+        """ Compute the configuration after the commands are applied, from
+            the current configuration and the args passed to the module,
+            normalized the same as the facts
+
+        :param existing_interfaces_facts: The current configuration
+        :param commands: The number of commands sent to the device, all of
+                         them, not only those returned in 'commands'
+        :rtype: A list
+        :returns: The configuration after the commands are applied
+        """
+        if not commands:
+            return existing_interfaces_facts
+        after = compute_after(existing_interfaces_facts,
+                              self._module.params['config'],
+                              self._module.params['state'],
+                              RESOURCE_KEY)
+        # the defaults of the options the user did not set
+        return normalize_config(after) if after else after
+
+    def scoped_names(self):
+        """ The RESOURCE_KEY of each instance in 'config', for the states
+            that change only those instances
+
+        :rtype: A list
+        :returns: The names, None to read the configuration of all of the
+                  instances
+        """
+        config = self._module.params['config']
+        scoped = self._module.params['state'] in self.scoped_states
+        if RESOURCE_KEY is None or not config or not scoped:
+            return None
+        names = [entry.get(RESOURCE_KEY) for entry in config]
+        if None in names or len(names) > self.max_scoped_instances:
+            return None
+        return names
+
+    def echo_commands(self, groups, commands, counts):
+        """ Pass the commands of each resource instance through, the first
+            max_echoed_commands are added to commands
+
+        :param groups: the commands of each resource instance
+        :param commands: the commands returned in 'commands'
+        :param counts: the number of commands and their bytes, added to
+        :rtype: generator
+        :returns: the commands of each resource instance
+        """
+        for group in groups:
+            counts['commands'] += len(group)
+            counts['bytes'] += sum(len(command) + 1 for command in group)
+            if self.max_echoed_commands is None:
+                commands.extend(group)
+            elif len(commands) < self.max_echoed_commands:
+                remaining = self.max_echoed_commands - len(commands)
+                commands.extend(group[:remaining])
+            yield group
+
+    def push_commands(self, groups):
+        """ Send the commands to the device, in batches of at most
+            max_batch_commands and max_batch_bytes, each batch as soon as
+            its commands are generated
+
+        :param groups: the commands of each resource instance
+        :rtype: A list
+        :returns: the number of commands and the elapsed time of each batch
+        """
+        # the cached facts of the host are those of the configuration before
+        # the commands
+        cache = facts_cache(self._module)
+        batches = []
+        for batch, instances in batch_commands(
+                groups, self.max_batch_commands, self.max_batch_bytes,
+                self.batch_by_instance, RESOURCE_KEY is not None):
+            if cache is not None:
+                cache.invalidate()
+                cache = None
+            start = time.time()
+            try:
+                with self._perf.phase('edit_config'):
+                    self._connection.edit_config(batch)
+            except ConnectionError as exc:
+                # the instances before the first of the batch were sent to
+                # the device, those of the batch were not, or only in part
+                self._module.fail_json(
+                    msg=to_text(exc), applied_instances=instances[0][0],
+                    failed_instances=[command for _index, command
+                                      in instances],
+                    failed_batch=len(batches), batches=batches)
+            batches.append({'commands': len(batch),
+                            'elapsed': round(time.time() - start, 3)})
+        return batches
+
+    def set_config(self, existing_interfaces_facts, grouped=False):
         """ Collect the configuration from the args passed to the module,
             collect the current configuration (as a dict from facts)
 
+        :param grouped: return a generator of the commands of each resource
+                        instance
         :rtype: A list
         :returns: the commands necessary to migrate the current configuration
                   to the desired configuration
         """
         want = self._module.params['config']
         have = existing_interfaces_facts
-        resp = self.set_state(want, have)
+        resp = self.set_state(want, have, grouped)
+        if grouped:
+            return resp
         return to_list(resp)
 
-    def set_state(self, want, have):
+    def set_state(self, want, have, grouped=False):
         """ Select the appropriate function based on the state provided
 
         :param want: the desired configuration as a dictionary
         :param have: the current configuration as a dictionary
+        :param grouped: return a generator of the commands of each resource
+                        instance
         :rtype: A list
         :returns: the commands necessary to migrate the current configuration
                   to the desired configuration
         """
         state = self._module.params['state']
+        want = index_config(want, RESOURCE_KEY)
+        have = index_config(have, RESOURCE_KEY)
         if state == 'overridden':
-            kwargs = {}
-            commands = self._state_overridden(**kwargs)
+            groups = self._state_overridden(want, have)
         elif state == 'deleted':
-            kwargs = {}
-            commands = self._state_deleted(**kwargs)
+            groups = self._state_deleted(want, have)
         elif state == 'merged':
-            kwargs = {}
-            commands = self._state_merged(**kwargs)
+            groups = self._state_merged(want, have)
         elif state == 'replaced':
-            kwargs = {}
-            commands = self._state_replaced(**kwargs)
-        return commands
+            groups = self._state_replaced(want, have)
+        groups = (group for group in groups if group)
+        if grouped:
+            return groups
+        return [command for group in groups for command in group]
 
-    @staticmethod
-    def _state_replaced(**kwargs):
+    def _state_replaced(self, want, have):
         """ The command generator when state is replaced
 
-        :rtype: A list
-        :returns: the commands necessary to migrate the current configuration
-                  to the desired configuration
+        :param want: the desired configuration, indexed by RESOURCE_KEY
+        :param have: the current configuration, indexed by RESOURCE_KEY
+        :rtype: A generator
+        :returns: the commands of each instance necessary to migrate the
+                  current configuration to the desired configuration
         """
-        commands = []
-        return commands
+        for key, entry in want.items():
+            yield self._replace_instance(entry, have.get(key))
 
-    @staticmethod
-    def _state_overridden(**kwargs):
+    def _state_overridden(self, want, have):
         """ The command generator when state is overridden
 
-        :rtype: A list
-        :returns: the commands necessary to migrate the current configuration
-                  to the desired configuration
+        :param want: the desired configuration, indexed by RESOURCE_KEY
+        :param have: the current configuration, indexed by RESOURCE_KEY
+        :rtype: A generator
+        :returns: the commands of each instance necessary to migrate the
+                  current configuration to the desired configuration
         """
-        commands = []
-        return commands
+        for key, entry in have.items():
+            if key not in want:
+                yield self.remove_instance(entry)
+        for group in self._state_replaced(want, have):
+            yield group
 
-    @staticmethod
-    def _state_merged(**kwargs):
+    def _state_merged(self, want, have):
         """ The command generator when state is merged
 
-        :rtype: A list
-        :returns: the commands necessary to merge the provided into
-                  the current configuration
+        :param want: the desired configuration, indexed by RESOURCE_KEY
+        :param have: the current configuration, indexed by RESOURCE_KEY
+        :rtype: A generator
+        :returns: the commands of each instance necessary to merge the
+                  provided into the current configuration
         """
-        commands = []
-        return commands
+        for key, entry in want.items():
+            options = set_options(have.get(key), entry)
+            yield self.instance_commands(
+                entry, [self.set_command(path, value)
+                        for path, value in options
+                        if path != (RESOURCE_KEY,)])
 
-    @staticmethod
-    def _state_deleted(**kwargs):
+    def _state_deleted(self, want, have):
         """ The command generator when state is deleted
 
+        :param want: the desired configuration, indexed by RESOURCE_KEY
+        :param have: the current configuration, indexed by RESOURCE_KEY
+        :rtype: A generator
+        :returns: the commands of each instance necessary to remove the
+                  current configuration of the provided objects
+        """
+        for key, entry in have.items():
+            if not want or key in want:
+                yield self.remove_instance(entry)
+
+    def _replace_instance(self, want, have):
+        """ The commands to replace the configuration of a resource instance,
+            the options not set in want are removed
+
+        :param want: the desired configuration of the instance
+        :param have: the current configuration of the instance, None if the
+                     instance is not configured
         :rtype: A list
-        :returns: the commands necessary to remove the current configuration
-                  of the provided objects
+        :returns: the commands for the instance
         """
         commands = []
-        return commands
+        for path, value in unset_options(have or {}, want):
+            if path == (RESOURCE_KEY,):
+                continue
+            if OPTION_INDEX.get('.'.join(path), {}).get('default') == value:
+                continue
+            commands.append(self.clear_command(path, value))
+        commands.extend(self.set_command(path, value)
+                        for path, value in set_options(have, want)
+                        if path != (RESOURCE_KEY,))
+        return self.instance_commands(want or have, commands)
+
+    def remove_instance(self, entry):
+        """ The commands to remove a resource instance, the command to remove
+            its RESOURCE_KEY, or the command to remove each of its options
+            without a RESOURCE_KEY
+
+        :param entry: the current configuration of the instance
+        :rtype: A list
+        :returns: the commands for the instance
+        """
+        if RESOURCE_KEY is None:
+            return self._replace_instance({}, entry)
+        return [self.clear_command((RESOURCE_KEY,), entry[RESOURCE_KEY])]
+
+    def instance_commands(self, entry, commands):
+        """ The commands for a resource instance within the context of the
+            instance, override for the device syntax
+
+        :param entry: the configuration of the instance
+        :param commands: the commands for the options of the instance
+        :rtype: A list
+        :returns: the commands, after the command for the instance
+        """
+        if not commands:
+            return []
+        if RESOURCE_KEY is None:
+            return commands
+        command = render_command((RESOURCE_KEY,), entry[RESOURCE_KEY])
+        return [command] + commands
+
+    @staticmethod
+    def set_command(path, value):
+        """ The command to set an option, override for the device syntax
+
+        :param path: the path of the option
+        :param value: the value of the option
+        :rtype: str
+        :returns: the command
+        """
+        return render_command(path, value)
+
+    @staticmethod
+    def clear_command(path, value):
+        """ The command to remove an option, override for the device syntax
+
+        :param path: the path of the option
+        :param value: the current value of the option
+        :rtype: str
+        :returns: the command
+        """
+        return 'no %s' % render_command(path, value)
@@ -9,16 +9,46 @@ this file validates each subset of facts and selectively
 calls the appropriate facts gathering function
 """
 
-from ansible.module_utils.network.myos.argspec.facts.facts import FactsArgs
+try:
+    from concurrent.futures import ThreadPoolExecutor
+    HAS_FUTURES = True
+except ImportError:
+    HAS_FUTURES = False
+
+import threading
+
+from ansible.module_utils.connection import ConnectionError
 from ansible.module_utils.network.common.facts.facts import FactsBase
-from ansible.module_utils.network.myos.facts.interfaces.interfaces import InterfacesFacts
+from ansible.module_utils.network.myos.utils.rmb_helpers import (
+    facts_cache,
+    load_fact_class,
+    perf_recorder,
+    split_sections,
+)
 
 
 FACT_LEGACY_SUBSETS = {}
+
+# the facts class of each resource by its import path, a resource is
+# imported only when it is gathered
 FACT_RESOURCE_SUBSETS = dict(
-    interfaces=InterfacesFacts,
+    interfaces='ansible.module_utils.network.myos.facts.'
+    'interfaces.interfaces.InterfacesFacts',
 )
 
+# the command for the running configuration, read once for all of the
+# resources gathered
+RUNNING_CONFIG_COMMAND = 'show running-config'
+
+# the command for a checksum of the running configuration, the facts of a
+# host are cached for the checksum. None, the facts are not cached, set it
+# for a device with such a command, such as 'show running-config checksum'
+# for the emulator of the network_os
+CONFIG_CHECKSUM_COMMAND = None
+
+# the running configuration is not read yet
+_UNREAD = object()
+
 
 class Facts(FactsBase):
     """ The fact class for myos
@@ -27,8 +57,24 @@ class Facts(FactsBase):
     VALID_LEGACY_GATHER_SUBSETS = frozenset(FACT_LEGACY_SUBSETS.keys())
     VALID_RESOURCE_SUBSETS = frozenset(FACT_RESOURCE_SUBSETS.keys())
 
-    def __init__(self, module):
+    # the number of resources gathered at the same time, more than 1 when
+    # the connection allows concurrent commands to the device
+    gather_workers = 1
+
+    def __init__(self, module, fact_resource_subsets=None):
+        """ The facts of the resources of fact_resource_subsets, all of the
+            resources of FACT_RESOURCE_SUBSETS by default
+
+        :param module: The module
+        :param fact_resource_subsets: The facts class of each resource, or its
+                                      import path
+        """
         super(Facts, self).__init__(module)
+        self._perf = perf_recorder(module)
+        self.fact_resource_subsets = (
+            fact_resource_subsets or FACT_RESOURCE_SUBSETS)
+        self._running_config = _UNREAD
+        self._running_config_lock = threading.Lock()
 
     def get_facts(self, legacy_facts_type=None, resource_facts_type=None, data=None):
         """ Collect the facts for myos
@@ -39,11 +85,177 @@ class Facts(FactsBase):
         :rtype: dict
         :return: the facts gathered
         """
-        netres_choices = FactsArgs.argument_spec['gather_network_resources'].get('choices', [])
         if self.VALID_RESOURCE_SUBSETS:
-            self.get_network_resources_facts(netres_choices, FACT_RESOURCE_SUBSETS, resource_facts_type, data)
+            self.get_network_resources_facts(self.fact_resource_subsets,
+                                             resource_facts_type, data)
 
         if self.VALID_LEGACY_GATHER_SUBSETS:
             self.get_network_legacy_facts(FACT_LEGACY_SUBSETS, legacy_facts_type)
 
         return self.ansible_facts, self._warnings
+
+    def get_running_config(self):
+        """ Read the running configuration from the device, once for all of
+            the resources gathered
+
+        :rtype: str
+        :returns: The running configuration, None for each resource to read
+                  its own configuration
+        """
+        return self._connection.get(RUNNING_CONFIG_COMMAND)
+
+    def read_running_config(self):
+        """ The running configuration, read from the device with
+            get_running_config on the first call only
+
+        :rtype: str
+        :returns: The running configuration
+        """
+        with self._running_config_lock:
+            if self._running_config is _UNREAD:
+                with self._perf.phase('fetch'):
+                    self._running_config = self.get_running_config()
+                if self._running_config is not None:
+                    self._perf.count('fetch', bytes=len(self._running_config))
+            return self._running_config
+
+    def lazy_section(self, delimiter):
+        """ The section of a resource in the running configuration, read
+            only when the resource asks for it
+
+        :param delimiter: The delimiter of the resource, a compiled regex
+        :rtype: callable
+        :returns: A callable for the section, None when the running
+                  configuration is not read
+        """
+        def section():
+            data = self.read_running_config()
+            if data is None:
+                return None
+            with self._perf.phase('split'):
+                return split_sections(data, {'section': delimiter})['section']
+        return section
+
+    def get_config_checksum(self):
+        """ Read the checksum of the running configuration from the device
+
+        :rtype: str
+        :returns: The checksum, None if the device has no checksum command or
+                  fails it
+        """
+        if CONFIG_CHECKSUM_COMMAND is None:
+            return None
+        try:
+            checksum = self._connection.get(CONFIG_CHECKSUM_COMMAND)
+        except ConnectionError:
+            return None
+        return checksum.strip() or None
+
+    def get_network_resources_facts(self, facts_resource_obj_map,
+                                    resource_facts_type=None, data=None):
+        """ Collect the facts of each resource, the running configuration is
+            read once and each resource is given only its section of it
+
+        :param facts_resource_obj_map: The facts class of each resource, or its
+                                       import path
+        :param resource_facts_type: List of resource fact types
+        :param data: previously collected conf
+        """
+        if not resource_facts_type:
+            resource_facts_type = self._gather_network_resources
+
+        valid_subsets = frozenset(facts_resource_obj_map.keys())
+        restorun_subsets = self.gen_runable(resource_facts_type,
+                                            valid_subsets,
+                                            resource_facts=True)
+        if not restorun_subsets:
+            return
+
+        self.ansible_facts['ansible_net_gather_network_resources'] = sorted(
+            restorun_subsets)
+
+        # the facts of the resources cached for the running configuration,
+        # when it is not given
+        cache = facts_cache(self._module) if data is None else None
+        checksum = None
+        cached = {}
+        if cache is not None:
+            with self._perf.phase('cache'):
+                checksum = self.get_config_checksum()
+                if checksum is not None:
+                    cached = cache.load(checksum)
+            self._perf.count('cache', hits=len(restorun_subsets & set(cached)))
+
+        instances = list()
+        for key in sorted(restorun_subsets):
+            if key in cached:
+                continue
+            fact_cls_obj = facts_resource_obj_map.get(key)
+            if fact_cls_obj:
+                fact_cls = load_fact_class(fact_cls_obj)
+                instances.append((key, fact_cls(self._module)))
+            else:
+                self._warnings.extend([
+                    "network resource fact gathering for '%s' is not"
+                    " supported" % key])
+
+        # the resources that read their own structured output are not given
+        # a section of the running configuration, only a callable for it, the
+        # running configuration is read when the device fails the structured
+        # command
+        delimiters = {}
+        lazy = {}
+        for key, inst in instances:
+            delimiter = getattr(inst, 'resource_delimiter', None)
+            if delimiter is None:
+                continue
+            if getattr(inst, 'use_structured', False):
+                lazy[key] = self.lazy_section(delimiter)
+            else:
+                delimiters[key] = delimiter
+        self._running_config = _UNREAD if data is None else data
+        given = data
+        if data is None and delimiters:
+            data = self.read_running_config()
+        sections = {}
+        if data is not None and delimiters:
+            with self._perf.phase('split'):
+                sections = split_sections(data, delimiters)
+
+        sections.update(lazy)
+        args = [(inst, given, sections.get(key)) for key, inst in instances]
+        if self.gather_workers > 1 and len(args) > 1 and HAS_FUTURES:
+            workers = self.gather_workers
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._populate_facts, args))
+        else:
+            results = [self._populate_facts(arg) for arg in args]
+        gathered = dict((key, facts)
+                        for (key, _inst), facts in zip(instances, results))
+        if cache is not None and checksum is not None and gathered:
+            cache.store(checksum, gathered)
+        gathered.update((key, facts) for key, facts in cached.items()
+                        if key in restorun_subsets)
+
+        # merged in the order of the resources, however they were gathered
+        for _key, facts in sorted(gathered.items()):
+            resources = facts.pop('ansible_network_resources')
+            self.ansible_facts['ansible_network_resources'].update(resources)
+            self.ansible_facts.update(facts)
+
+    def _populate_facts(self, args):
+        """ Populate the facts of a resource, into facts of its own
+
+        :param args: The facts class of the resource, the configuration given
+                     and the section of the running configuration read for
+                     the resource, or a callable for it
+        :rtype: dict
+        :returns: The facts of the resource
+        """
+        inst, data, section = args
+        facts = {'ansible_network_resources': {}}
+        if section is None:
+            inst.populate_facts(self._connection, facts, data)
+        else:
+            inst.populate_facts(self._connection, facts, data, section=section)
+        return facts
@@ -10,106 +10,173 @@ for a given resource, parsed, and the facts tree is populated
 based on the configuration.
 """
 import re
-from copy import deepcopy
 
+from ansible.module_utils._text import to_text
+from ansible.module_utils.connection import ConnectionError
 from ansible.module_utils.network.common import utils
-from ansible.module_utils.network.myos.argspec.interfaces.interfaces import InterfacesArgs
+from ansible.module_utils.network.myos.argspec.interfaces.interfaces import (
+    InterfacesArgs,
+    new_facts,
+    normalize_config,
+)
+from ansible.module_utils.network.myos.parsers.interfaces.interfaces import (
+    CONFIG_COMMAND,
+    FETCH_INSTANCE,
+    RESOURCE_DELIMITER,
+    STRUCTURED,
+    load_structured,
+    parse_config,
+    parse_structured,
+    split_config,
+)
+from ansible.module_utils.network.myos.utils.rmb_helpers import perf_recorder
 
 
 class InterfacesFacts(object):
     """ The myos interfaces fact class
     """
 
-    def __init__(self, module, subspec='config', options='options'):
+    # the lines of the running configuration that start the section of the
+    # resource, the facts class gives populate_facts only its section. None,
+    # populate_facts reads the configuration of the resource with
+    # CONFIG_COMMAND
+    resource_delimiter = RESOURCE_DELIMITER
+
+    # parse the output of the STRUCTURED command of the model, the facts
+    # class reads it itself, the CLI configuration is parsed when the device
+    # fails the command or its output is not valid
+    use_structured = STRUCTURED is not None
+
+    # validate the facts with utils.validate_config and the argument_spec,
+    # instead of the generated normalize_config, to debug normalize_config
+    generic_validation = False
+
+    def __init__(self, module):
         self._module = module
         self.argument_spec = InterfacesArgs.argument_spec
-        spec = deepcopy(self.argument_spec)
-        if subspec:
-            if options:
-                facts_argument_spec = spec[subspec][options]
-            else:
-                facts_argument_spec = spec[subspec]
-        else:
-            facts_argument_spec = spec
-
-        self.generated_spec = utils.generate_dict(facts_argument_spec)
+        # the facts tree of a 'config' entry is generated with the argspec,
+        # a new one for each instance of the class, which may change it
+        self.generated_spec = new_facts()
+        self._perf = perf_recorder(module)
 
-    def populate_facts(self, connection, ansible_facts, data=None):
+    def populate_facts(self, connection, ansible_facts, data=None,
+                       section=None):
         """ Populate the facts for interfaces
         :param connection: the device connection
         :param ansible_facts: Facts dictionary
         :param data: previously collected conf
+        :param section: the section of the running configuration for the
+                        resource, read by the facts class for all of the
+                        resources, or a callable for it, parsed when data
+                        is not given and the structured output is not read
         :rtype: dictionary
         :returns: facts
         """
-        if connection:  # just for linting purposes, remove
-            pass
-
-        if not data:
-            # typically data is populated from the current device configuration
-            # data = connection.get('show running-config | section ^interface')
-            # using mock data instead
-            data = ("resource rsrc_a\n"
-                    "  a_bool true\n"
-                    "  a_string choice_a\n"
-                    "  resource here\n"
-                    "resource rscrc_b\n"
-                    "  key is property01 value is value end\n"
-                    "  an_int 10\n")
-
-        # split the config into instances of the resource
-        resource_delim = 'resource'
-        find_pattern = r'(?:^|\n)%s.*?(?=(?:^|\n)%s|$)' % (resource_delim,
-                                                           resource_delim)
-        resources = [p.strip() for p in re.findall(find_pattern,
-                                                   data,
-                                                   re.DOTALL)]
-
-        objs = []
-        for resource in resources:
-            if resource:
-                obj = self.render_config(self.generated_spec, resource)
-                if obj:
-                    objs.append(obj)
+        objs = None
+        resources = ()
+        if data is None and self.use_structured:
+            objs = self.get_structured(connection)
+        if objs is None:
+            if data is None:
+                data = section() if callable(section) else section
+            if data is None:
+                with self._perf.phase('fetch'):
+                    # the configuration of the resource only
+                    data = connection.get(CONFIG_COMMAND)
+                self._perf.count('fetch', bytes=len(data))
+
+            # split the config into instances of the resource, one at a time
+            resources = split_config(data)
+            objs = []
+
+        with self._perf.phase('parse'):
+            for resource in resources:
+                if resource:
+                    obj = self.render_config(resource)
+                    if obj:
+                        objs.append(obj)
+        self._perf.count('parse', instances=len(objs))
+
+        ansible_facts['ansible_network_resources'].pop('interfaces', None)
         facts = {}
+        # the record of each instance is converted to its facts tree only
+        # here, once all of them are parsed
+        objs = [obj for obj in (record.to_dict() for record in objs) if obj]
         if objs:
-            params = utils.validate_config(self.argument_spec, {'config': objs})
-            facts['interfaces'] = params['config']
+            facts['interfaces'] = self.validate_config(objs)
 
         ansible_facts['ansible_network_resources'].update(facts)
         return ansible_facts
 
-    def render_config(self, spec, conf):
-        """
-        Render config as dictionary structure and delete keys
-          from spec for null values
+    def get_structured(self, connection):
+        """ Read and parse the output of the STRUCTURED command
 
-        :param spec: The facts tree, generated from the argspec
-        :param conf: The configuration
-        :rtype: dictionary
-        :returns: The generated config
+        :param connection: the device connection
+        :rtype: list
+        :returns: The record of each resource instance, None when the device
+                  fails the command or its output is not valid
         """
-        config = deepcopy(spec)
-
-        config['name'] = utils.parse_conf_arg(conf, 'resource')
-        config['some_string'] = utils.parse_conf_arg(conf, 'a_string')
-
-        match = re.match(r'.*key is property01 (\S+)',
-                         conf, re.MULTILINE | re.DOTALL)
-        if match:
-            config['some_dict']['property_01'] = match.groups()[0]
+        try:
+            with self._perf.phase('fetch'):
+                data = connection.get(STRUCTURED['command'])
+            self._perf.count('fetch', bytes=len(data))
+            with self._perf.phase('parse'):
+                objs = [parse_structured(node)
+                        for node in load_structured(data)]
+        except (ConnectionError, ValueError):
+            self._perf.count('fetch', fallbacks=1)
+            return None
+        return objs
+
+    def get_instances(self, connection, names):
+        """ Read the configuration of the named resource instances only,
+            with a single FETCH_INSTANCE command for all of them
 
-        a_bool = utils.parse_conf_arg(conf, 'a_bool')
-        if a_bool == 'true':
-            config['some_bool'] = True
-        elif a_bool == 'false':
-            config['some_bool'] = False
+        :param connection: the device connection
+        :param names: The RESOURCE_KEY of each instance
+        :rtype: str
+        :returns: The configuration of the instances, None without a
+                  FETCH_INSTANCE
+        """
+        if FETCH_INSTANCE is None:
+            return None
+        # the '{}' of FETCH_INSTANCE is within a regex of the device, each
+        # name is escaped and the names are alternatives of a group
+        names = sorted(set(re.escape(to_text(name)) for name in names))
+        if len(names) == 1:
+            command = FETCH_INSTANCE.format(names[0])
         else:
-            config['some_bool'] = None
-
-        try:
-            config['some_int'] = int(utils.parse_conf_arg(conf, 'an_int'))
-        except TypeError:
-            config['some_int'] = None
+            command = FETCH_INSTANCE.format('(%s)' % '|'.join(names))
+        with self._perf.phase('fetch'):
+            data = connection.get(command)
+        self._perf.count('fetch', bytes=len(data), instances=len(names))
+        return data
+
+    def validate_config(self, objs):
+        """ Validate and normalize the facts with the argument_spec
+
+        :param objs: The facts of each resource instance
+        :rtype: list
+        :returns: The facts, validated
+        """
+        self._perf.count('validate', instances=len(objs))
+        with self._perf.phase('validate'):
+            if self.generic_validation:
+                params = utils.validate_config(self.argument_spec,
+                                               {'config': objs})
+                return params['config']
+            try:
+                return normalize_config(objs)
+            except (TypeError, ValueError) as exc:
+                self._module.fail_json(msg=to_text(exc))
+
+    def render_config(self, conf):
+        """
+        Render config as a record, converted to the dictionary structure
+          without the null values by populate_facts
 
-        return utils.remove_empties(config)
+        :param conf: The configuration
+        :rtype: ConfigRecord
+        :returns: The record parsed with the PARSERS of the model
+        """
+        return parse_config(conf)
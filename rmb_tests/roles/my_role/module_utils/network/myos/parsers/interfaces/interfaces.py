@@ -0,0 +1,343 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+#############################################
+#                WARNING                    #
+#############################################
+#
+# This file is auto generated by the resource
+#   module builder playbook.
+#
+# Do not edit this file manually.
+#
+# Changes to this file will be over written
+#   by the resource module builder.
+#
+# Changes should be made in the model used to
+#   generate this file or in the resource module
+#   builder template.
+#
+#############################################
+
+"""
+The parsers for the myos_interfaces facts, generated from the
+PARSERS and the STRUCTURED source of the model
+"""
+import json
+import re
+from xml.etree import ElementTree
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.six import string_types
+from ansible.module_utils.network.myos.argspec.interfaces.interfaces import (
+    ConfigRecord,
+)
+
+
+# Each of the parsers: its group in PARSER, the regex for a line of a
+# resource instance with one group for the value, the format of the command
+# for a value, the path of the option in the facts tree, the type of the
+# value, whether the value is appended to a list, the map of the values
+# parsed to the values of the option and its reverse for the commands
+PARSERS = [{'getval': '^resource (\\S+)',
+            'group': 1,
+            'list': False,
+            'path': ('name',),
+            'setval': 'resource {}',
+            'texts': None,
+            'type': 'str',
+            'values': None},
+           {'getval': '^\\s+a_string (\\S+)',
+            'group': 3,
+            'list': False,
+            'path': ('some_string',),
+            'setval': 'a_string {}',
+            'texts': None,
+            'type': 'str',
+            'values': None},
+           {'getval': '^\\s+a_bool (\\S+)',
+            'group': 5,
+            'list': False,
+            'path': ('some_bool',),
+            'setval': 'a_bool {}',
+            'texts': {False: 'false', True: 'true'},
+            'type': 'bool',
+            'values': {'false': False, 'true': True}},
+           {'getval': '^\\s+an_int (\\d+)',
+            'group': 7,
+            'list': False,
+            'path': ('some_int',),
+            'setval': 'an_int {}',
+            'texts': None,
+            'type': 'int',
+            'values': None},
+           {'getval': '^\\s+key is property01 (\\S+)',
+            'group': 9,
+            'list': False,
+            'path': ('some_dict', 'property_01'),
+            'setval': 'key is property01 {}',
+            'texts': None,
+            'type': 'str',
+            'values': None}]  # pylint: disable=C0301
+
+# All of the parsers as a single regex, each parser wrapped in a group, so
+# an instance is parsed with a single pass over its configuration
+PARSER = re.compile('|'.join('(%s)' % parser['getval'] for parser in PARSERS),
+                    re.M) if PARSERS else None
+
+DISPATCH = dict((parser['group'], parser) for parser in PARSERS)
+
+RENDERERS = dict((parser['path'], parser) for parser in PARSERS)
+
+# a line that matches starts the section of the resource in the running
+# configuration, and the configuration of a resource instance. None, the
+# resource is not given a section of the running configuration, it reads its
+# own with CONFIG_COMMAND and each line that is not indented starts an
+# instance
+RESOURCE_DELIMITER = 'resource '
+if RESOURCE_DELIMITER is not None:
+    RESOURCE_DELIMITER = re.compile(RESOURCE_DELIMITER)
+
+# the command for the configuration of the resource only
+CONFIG_COMMAND = 'show running-config | section resource'
+
+# the command for the configuration of the named resource instances, the '{}'
+# is within a regex of the device and is formatted with the escaped
+# RESOURCE_KEY of an instance or a group of them, None to read the
+# configuration of all of the instances
+FETCH_INSTANCE = 'show running-config | section ^resource {}$'
+
+# The structured source of the facts: the command with JSON or XML output,
+# the path of the resource instances in the output, and for each of the
+# fields its path in the output of an instance, the path of the option in
+# the facts tree, the type of the value, whether the value is appended to a
+# list, the map of the values to the values of the option and its reverse.
+# None to parse the CLI configuration with the PARSERS only
+STRUCTURED = {'command': 'show running-config | json',
+              'fields': [{'list': False,
+                          'option': ('name',),
+                          'path': ('name',),
+                          'texts': None,
+                          'type': 'str',
+                          'values': None},
+                         {'list': False,
+                          'option': ('some_string',),
+                          'path': ('a_string',),
+                          'texts': None,
+                          'type': 'str',
+                          'values': None},
+                         {'list': False,
+                          'option': ('some_bool',),
+                          'path': ('a_bool',),
+                          'texts': None,
+                          'type': 'bool',
+                          'values': None},
+                         {'list': False,
+                          'option': ('some_int',),
+                          'path': ('an_int',),
+                          'texts': None,
+                          'type': 'int',
+                          'values': None},
+                         {'list': False,
+                          'option': ('some_dict', 'property_01'),
+                          'path': ('key', 'property01'),
+                          'texts': None,
+                          'type': 'str',
+                          'values': None}],
+              'format': 'json',
+              'instances': ('resources', 'resource')}  # pylint: disable=C0301
+
+CONVERTERS = {
+    'int': int,
+    'float': float,
+}
+
+
+def _lines(data):
+    """ The lines of the configuration, without a copy of the configuration
+
+    :param data: The configuration, or an iterable of its lines
+    """
+    if not isinstance(data, string_types):
+        for line in data:
+            yield line.rstrip('\r\n')
+        return
+
+    start = 0
+    while start < len(data):
+        end = data.find('\n', start)
+        if end == -1:
+            end = len(data)
+        yield data[start:end]
+        start = end + 1
+
+
+def _starts_instance(line):
+    """ Whether a line of the configuration starts a resource instance
+    """
+    if RESOURCE_DELIMITER is None:
+        return bool(line) and not line[0].isspace()
+    return RESOURCE_DELIMITER.match(line) is not None
+
+
+def split_config(data):
+    """ Split the configuration into the configuration of each resource
+        instance, line by line. Each instance is yielded once its last line
+        is read, an instance ends at the next line that is not indented. The
+        lines that are not within an instance are ignored
+
+    :param data: The configuration, or an iterable of its lines
+    :rtype: generator
+    :returns: The configuration of each resource instance
+    """
+    block = None
+    for line in _lines(data):
+        if _starts_instance(line):
+            if block:
+                yield '\n'.join(block).strip()
+            block = [line]
+        elif line and not line[0].isspace():
+            if block:
+                yield '\n'.join(block).strip()
+            block = None
+        elif block is not None:
+            block.append(line)
+    if block:
+        yield '\n'.join(block).strip()
+
+
+def parse_config(conf):
+    """ Parse the configuration of a resource instance
+
+    :param conf: The configuration of a resource instance
+    :rtype: ConfigRecord
+    :returns: A new record with the values parsed, to_dict() is its facts
+              tree
+    """
+    config = ConfigRecord()
+    if PARSER is None:
+        return config
+
+    for match in PARSER.finditer(conf):
+        # the group of the parser is the last to close, the value follows
+        parser = DISPATCH[match.lastindex]
+        value = match.group(match.lastindex + 1)
+        if value is None:
+            continue
+        if parser['values'] is not None:
+            value = parser['values'].get(value)
+        elif parser['type'] in CONVERTERS:
+            try:
+                value = CONVERTERS[parser['type']](value)
+            except ValueError:
+                value = None
+        if value is None:
+            continue
+        _assign(config, parser['path'], parser['list'], value)
+    return config
+
+
+def _assign(config, path, is_list, value):
+    """ Set the value of an option of a record, or append it to a list
+    """
+    tree = config
+    for key in path[:-1]:
+        tree = getattr(tree, key)
+    key = path[-1]
+    if is_list:
+        values = getattr(tree, key)
+        if values is None:
+            setattr(tree, key, [value])
+        else:
+            values.append(value)
+    else:
+        setattr(tree, key, value)
+
+
+def _find(node, path):
+    """ The nodes at a path of the structured output, the elements of XML
+        and the values of JSON, each item of a list
+    """
+    if STRUCTURED['format'] == 'xml':
+        return node.findall('/'.join(path))
+    for key in path:
+        if not isinstance(node, dict):
+            return []
+        node = node.get(key)
+    if node is None:
+        return []
+    return node if isinstance(node, list) else [node]
+
+
+def _convert(field, value):
+    """ Convert a value of the structured output to the type of its option
+    """
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    if isinstance(value, string_types) and field['values'] is not None:
+        return field['values'].get(value)
+    if field['type'] in CONVERTERS:
+        try:
+            return CONVERTERS[field['type']](value)
+        except (TypeError, ValueError):
+            return None
+    if field['type'] == 'str' and not isinstance(value, string_types):
+        return to_text(value)
+    return value
+
+
+def load_structured(data):
+    """ Load the output of the STRUCTURED command
+
+    :param data: The output of the command
+    :rtype: list
+    :returns: The output of each resource instance
+    :raises ValueError: The output is not valid JSON or XML
+    """
+    if STRUCTURED['format'] == 'xml':
+        try:
+            root = ElementTree.fromstring(to_bytes(data))
+        except ElementTree.ParseError as exc:
+            raise ValueError('invalid XML: %s' % exc)
+    else:
+        root = json.loads(data)
+    return _find(root, STRUCTURED['instances'])
+
+
+def parse_structured(node):
+    """ Parse the structured output of a resource instance, with the fields
+        of STRUCTURED
+
+    :param node: The output of a resource instance, from load_structured
+    :rtype: ConfigRecord
+    :returns: A new record with the values of the fields, to_dict() is its
+              facts tree
+    """
+    config = ConfigRecord()
+    is_xml = STRUCTURED['format'] == 'xml'
+    for field in STRUCTURED['fields']:
+        for value in _find(node, field['path']):
+            value = _convert(field, value.text if is_xml else value)
+            if value is not None:
+                _assign(config, field['option'], field['list'], value)
+    return config
+
+
+def render_command(path, value):
+    """ Render the command for the value of an option, with the setval of
+        its parser
+
+    :param path: The path of the option in the facts tree
+    :param value: The value of the option
+    :rtype: str
+    :returns: The command, the path and the value without a setval
+    """
+    parser = RENDERERS.get(tuple(path))
+    if parser is not None and parser['texts'] is not None:
+        value = parser['texts'].get(value, value)
+    if parser is not None and parser['setval'] is not None:
+        return parser['setval'].format(value)
+    return '%s %s' % (' '.join(path), value)
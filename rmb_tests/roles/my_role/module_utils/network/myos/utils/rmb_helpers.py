@@ -0,0 +1,627 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+#############################################
+#                WARNING                    #
+#############################################
+#
+# This file is auto generated by the resource
+#   module builder playbook.
+#
+# Do not edit this file manually.
+#
+# Changes to this file will be over written
+#   by the resource module builder.
+#
+# Changes should be made in the resource module
+#   builder template.
+#
+#############################################
+
+"""
+The helpers of the myos resource modules, generated by the
+resource module builder. The utils of the network_os are left to its
+authors
+"""
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from copy import deepcopy
+from importlib import import_module
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.common.validation import (
+    check_type_bool,
+    check_type_dict,
+    check_type_float,
+    check_type_int,
+    check_type_list,
+    check_type_str,
+)
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.module_utils.six import integer_types, string_types
+
+# the environment variable that enables the timing of the phases
+PERF_ENV = 'MYOS_PERF'
+
+# the environment variable with the directory of the facts cache, the facts
+# are not cached without it
+FACTS_CACHE_ENV = 'MYOS_FACTS_CACHE'
+
+# the values removed from the facts tree, the same as utils.remove_empties
+EMPTY_VALUES = (None, [], {}, (), '')
+
+try:
+    CPU_TIME = time.process_time
+except AttributeError:
+    CPU_TIME = time.clock
+
+
+def _without_defaults(options):
+    result = {}
+    for name, option in options.items():
+        option = dict((key, value) for key, value in option.items()
+                      if key != 'default')
+        if 'options' in option:
+            option['options'] = _without_defaults(option['options'])
+        result[name] = option
+    return result
+
+
+def user_argument_spec(argument_spec):
+    """ The argument_spec of the module without the defaults of the 'config'
+        suboptions, the module is given only the options the user set. The
+        defaults are those of the device, the facts are normalized with them
+
+    :param argument_spec: The argument_spec of the resource
+    :rtype: dictionary
+    :returns: The argument_spec for the module
+    """
+    result = dict(argument_spec)
+    if 'options' in result.get('config', {}):
+        result['config'] = dict(result['config'],
+                                options=_without_defaults(
+                                    result['config']['options']))
+    return result
+
+
+def merge_config(have, want):
+    """ Merge the values set in the desired configuration of a resource
+        instance into the current configuration, lists are merged as a union
+
+    :param have: The current configuration of the instance
+    :param want: The desired configuration of the instance
+    :rtype: dictionary
+    :returns: The merged configuration
+    """
+    result = deepcopy(have)
+    for key, value in want.items():
+        if value is None:
+            continue
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = merge_config(result[key], value)
+        elif isinstance(value, list) and isinstance(result.get(key), list):
+            result[key].extend(deepcopy(item) for item in value
+                               if item not in result[key])
+        else:
+            result[key] = deepcopy(value)
+    return result
+
+
+def compute_after(have, want, state, key=None):
+    """ Compute the configuration after the commands for a state are applied,
+        from the current and the desired configuration, without reading the
+        configuration from the device again
+
+    :param have: The current configuration
+    :param want: The desired configuration
+    :param state: The state of the module
+    :param key: The option that identifies a resource instance, None to
+                compare the instances as a whole
+    :rtype: A list or a dictionary, the same as the configuration
+    :returns: The configuration after the commands are applied
+    """
+    if isinstance(have, dict) or isinstance(want, dict):
+        # a resource with a single instance
+        if state == 'merged':
+            return merge_config(have or {}, want or {})
+        if state in ('replaced', 'overridden'):
+            return deepcopy(want or {})
+        return {}
+
+    have = have or []
+    want = want or []
+    if state == 'overridden':
+        return deepcopy(want)
+    if state == 'deleted' and not want:
+        return []
+
+    if key is None:
+        if state == 'deleted':
+            return [deepcopy(entry) for entry in have if entry not in want]
+        if state == 'replaced':
+            return deepcopy(want)
+        return deepcopy(have) + [deepcopy(entry) for entry in want
+                                 if entry not in have]
+
+    wanted = dict((entry.get(key), entry) for entry in want)
+    after = []
+    for entry in have:
+        name = entry.get(key)
+        if name not in wanted:
+            after.append(deepcopy(entry))
+        elif state == 'merged':
+            after.append(merge_config(entry, wanted[name]))
+        elif state == 'replaced':
+            after.append(deepcopy(wanted[name]))
+    if state in ('merged', 'replaced'):
+        existing = set(entry.get(key) for entry in have)
+        after.extend(deepcopy(entry) for entry in want
+                     if entry.get(key) not in existing)
+    return after
+
+
+def index_config(config, key=None):
+    """ Index the resource instances by their key, in a single pass
+
+    :param config: The configuration, a list of the resource instances or a
+                   dictionary for a resource with a single instance
+    :param key: The option that identifies a resource instance, None to
+                identify an instance by all of its options
+    :rtype: OrderedDict
+    :returns: Each of the instances by the value of its key, in the order of
+              the configuration, by None for a resource with a single instance
+    """
+    if isinstance(config, dict):
+        return OrderedDict([(None, config)])
+    if key is None:
+        # the same as compute_after, an instance is the same only when all
+        # of its options are
+        return OrderedDict((json.dumps(entry, sort_keys=True), entry)
+                           for entry in config or [])
+    return OrderedDict((entry.get(key), entry) for entry in config or [])
+
+
+def _members(values):
+    # a set for the membership test of the items of a list, when hashable
+    try:
+        return set(values or [])
+    except TypeError:
+        return values or []
+
+
+def set_options(have, want, path=()):
+    """ The options set in the desired configuration of a resource instance
+        and not the same in the current configuration, the items of a list
+        are each an option
+
+    :param have: The current configuration of the instance
+    :param want: The desired configuration of the instance
+    :param path: The path of the configuration in the facts tree
+    :rtype: generator
+    :returns: The path and the value of each of the options
+    """
+    have = have or {}
+    for key, value in want.items():
+        if value is None:
+            continue
+        current = have.get(key)
+        if isinstance(value, dict):
+            for option in set_options(current, value, path + (key,)):
+                yield option
+        elif isinstance(value, list):
+            current = _members(current)
+            for item in value:
+                if item not in current:
+                    yield path + (key,), item
+        elif value != current:
+            yield path + (key,), value
+
+
+def unset_options(have, want, path=()):
+    """ The options set in the current configuration of a resource instance
+        and not set in the desired configuration, the items of a list are
+        each an option
+
+    :param have: The current configuration of the instance
+    :param want: The desired configuration of the instance
+    :param path: The path of the configuration in the facts tree
+    :rtype: generator
+    :returns: The path and the value of each of the options
+    """
+    want = want or {}
+    for key, value in have.items():
+        if value is None:
+            continue
+        wanted = want.get(key)
+        if isinstance(value, dict):
+            for option in unset_options(value, wanted, path + (key,)):
+                yield option
+        elif isinstance(value, list):
+            wanted = _members(wanted)
+            for item in value:
+                if item not in wanted:
+                    yield path + (key,), item
+        elif wanted is None:
+            yield path + (key,), value
+
+
+def _units(groups, by_group, context):
+    # the commands added to a batch at a time, each with the position of its
+    # group and the command repeated when a batch starts within the group,
+    # the context of a group is not split from its first command
+    for index, group in enumerate(groups):
+        if by_group or len(group) < 2:
+            yield index, group, None
+        elif context:
+            yield index, group[:2], None
+            for command in group[2:]:
+                yield index, [command], group[0]
+        else:
+            for command in group:
+                yield index, [command], None
+
+
+def batch_commands(groups, max_commands=None, max_bytes=None, by_group=True,
+                   context=False):
+    """ Split the commands into batches, each of at most max_commands
+        commands and max_bytes bytes, one command per line
+
+    :param groups: The commands, in groups such as those of a resource
+                   instance
+    :param max_commands: The most commands in a batch, None for no limit
+    :param max_bytes: The most bytes in a batch, None for no limit
+    :param by_group: Keep the commands of a group within a batch, a group
+                     larger than the limits is a batch of its own
+    :param context: The first command of a group is the context of the
+                    others, such as the command for a resource instance, and
+                    is repeated at the start of each batch with the other
+                    commands of the group
+    :rtype: generator
+    :returns: Each of the batches, a list of commands, and the position and
+              the first command of each group with commands in the batch
+    """
+    batch = []
+    groups_in_batch = []
+    size = 0
+    for index, unit, repeat in _units(groups, by_group, context):
+        unit_size = sum(len(to_bytes(command)) + 1 for command in unit)
+        over_commands = max_commands and len(batch) + len(unit) > max_commands
+        over_bytes = max_bytes and size + unit_size > max_bytes
+        if batch and (over_commands or over_bytes):
+            yield batch, groups_in_batch
+            batch = []
+            groups_in_batch = []
+            size = 0
+        if not groups_in_batch or groups_in_batch[-1][0] != index:
+            groups_in_batch.append((index, repeat or unit[0]))
+            if repeat is not None:
+                batch.append(repeat)
+                size += len(to_bytes(repeat)) + 1
+        batch.extend(unit)
+        size += unit_size
+    if batch:
+        yield batch, groups_in_batch
+
+
+def _invalid(value, path, value_type, error):
+    return TypeError("argument %s is of type %s found in '%s'. and we were"
+                     " unable to convert to %s: %s"
+                     % (path.rsplit('.', 1)[-1], type(value),
+                        path.rsplit('.', 1)[0].replace('.', ' -> '),
+                        value_type, to_text(error)))
+
+
+def check_str(value, path):
+    """ Check a value of an option of type str, the same as the argspec
+
+    :param value: The value
+    :param path: The path of the option, for the error
+    :rtype: str
+    :returns: The value, converted
+    """
+    if isinstance(value, string_types):
+        return value
+    try:
+        return check_type_str(value)
+    except TypeError as exc:
+        raise _invalid(value, path, 'str', exc)
+
+
+def check_int(value, path):
+    """ Check a value of an option of type int, the same as the argspec
+    """
+    if isinstance(value, integer_types):
+        return value
+    try:
+        return check_type_int(value)
+    except TypeError as exc:
+        raise _invalid(value, path, 'int', exc)
+
+
+def check_float(value, path):
+    """ Check a value of an option of type float, the same as the argspec
+    """
+    if isinstance(value, float):
+        return value
+    try:
+        return check_type_float(value)
+    except TypeError as exc:
+        raise _invalid(value, path, 'float', exc)
+
+
+def check_bool(value, path):
+    """ Check a value of an option of type bool, the same as the argspec
+    """
+    if isinstance(value, bool):
+        return value
+    try:
+        return check_type_bool(value)
+    except TypeError as exc:
+        raise _invalid(value, path, 'bool', exc)
+
+
+def check_dict(value, path):
+    """ Check a value of an option of type dict, the same as the argspec
+    """
+    if isinstance(value, dict):
+        return value
+    try:
+        return check_type_dict(value)
+    except TypeError as exc:
+        raise _invalid(value, path, 'dict', exc)
+
+
+def check_list(value, path):
+    """ Check a value of an option of type list, the same as the argspec, a
+        string is split on commas
+    """
+    if isinstance(value, list):
+        return value
+    try:
+        return check_type_list(value)
+    except TypeError as exc:
+        raise _invalid(value, path, 'list', exc)
+
+
+def check_keys(entry, supported, path):
+    """ Check the keys of a dictionary of the options are all options, the
+        same as the argspec
+    """
+    unsupported = [key for key in entry if key not in supported]
+    if unsupported:
+        raise ValueError("Unsupported parameters: %s found in %s. Supported"
+                         " parameters include: %s"
+                         % (', '.join(sorted(to_text(key)
+                                             for key in unsupported)),
+                            path.replace('.', ' -> '),
+                            ', '.join(sorted(supported))))
+
+
+def check_choices(value, choices, path):
+    """ Check a value, or each of the items of a list, is one of the choices
+    """
+    for item in value if isinstance(value, list) else [value]:
+        if item is not None and item not in choices:
+            raise ValueError("value of %s must be one of: %s, got: %s found"
+                             " in %s" % (path.rsplit('.', 1)[-1],
+                                         ', '.join(to_text(choice)
+                                                   for choice in choices),
+                                         item, path.rsplit('.', 1)[0]))
+
+
+def _lines(data):
+    """ The lines of the configuration, without a copy of the configuration
+    """
+    start = 0
+    while start < len(data):
+        end = data.find('\n', start)
+        if end == -1:
+            end = len(data)
+        yield data[start:end]
+        start = end + 1
+
+
+def split_sections(data, delimiters):
+    """ Split the running configuration into the section of each resource,
+        in a single pass. A line that matches the delimiter of a resource
+        starts a section of the resource, the section ends at the next line
+        that is not indented
+
+    :param data: The running configuration
+    :param delimiters: The delimiter of each resource, a compiled regex
+    :rtype: dict
+    :returns: The section of each resource, an empty string when the running
+              configuration has no section for the resource
+    """
+    sections = dict((name, []) for name in delimiters)
+    current = []
+    for line in _lines(data):
+        matched = [name for name, delimiter in delimiters.items()
+                   if delimiter.match(line)]
+        if matched:
+            current = matched
+        elif line and not line[0].isspace():
+            current = []
+        for name in current:
+            sections[name].append(line)
+    return dict((name, '\n'.join(lines)) for name, lines in sections.items())
+
+
+def load_fact_class(fact_cls):
+    """ The facts class of a resource, imported from its path
+
+    :param fact_cls: The facts class, or its import path
+    :rtype: type
+    :returns: The facts class
+    """
+    if not isinstance(fact_cls, string_types):
+        return fact_cls
+    module_name, class_name = fact_cls.rsplit('.', 1)
+    return getattr(import_module(module_name), class_name)
+
+
+class PerfRecorder(object):
+    """ Record the wall and cpu time and the counts of each phase of a
+        module, when enabled
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._phases = OrderedDict()
+
+    def _phase(self, name):
+        if name not in self._phases:
+            self._phases[name] = {'calls': 0, 'wall': 0.0, 'cpu': 0.0}
+        return self._phases[name]
+
+    @contextmanager
+    def phase(self, name):
+        """ Time a phase, the times of each call of a phase are summed
+        """
+        if not self.enabled:
+            yield
+            return
+        wall = time.time()
+        cpu = CPU_TIME()
+        try:
+            yield
+        finally:
+            phase = self._phase(name)
+            phase['calls'] += 1
+            phase['wall'] += time.time() - wall
+            phase['cpu'] += CPU_TIME() - cpu
+
+    def iterate(self, name, iterable):
+        """ Time the items of an iterable as each is produced, such as the
+            commands of a generator, the times are summed into a phase
+
+        :param name: The phase
+        :param iterable: The iterable
+        :rtype: generator
+        :returns: Each of the items
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name, **counts):
+        """ Add to the counts of a phase, such as instances or bytes
+        """
+        if not self.enabled:
+            return
+        phase = self._phase(name)
+        for key, value in counts.items():
+            phase[key] = phase.get(key, 0) + value
+
+    def results(self):
+        """ The times and the counts of each phase, the times in seconds
+        """
+        results = {}
+        for name, phase in self._phases.items():
+            results[name] = dict(phase)
+            results[name]['wall'] = round(phase['wall'], 6)
+            results[name]['cpu'] = round(phase['cpu'], 6)
+        return results
+
+
+def perf_recorder(module):
+    """ The perf recorder of a module, shared by the facts and the config
+        classes, enabled by PERF_ENV
+
+    :param module: The module
+    :rtype: PerfRecorder
+    :returns: The perf recorder
+    """
+    recorder = getattr(module, '_perf_recorder', None)
+    if recorder is None:
+        enabled = boolean(os.environ.get(PERF_ENV, False), strict=False)
+        recorder = PerfRecorder(enabled)
+        module._perf_recorder = recorder
+    return recorder
+
+
+class FactsCache(object):
+    """ The facts of the resources of a host, as parsed from the running
+        configuration with a checksum, in a file of its own. The facts are
+        valid only for the same checksum, and are removed when the
+        configuration is changed
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, checksum):
+        """ The facts of each resource cached for the checksum
+
+        :param checksum: The checksum of the running configuration
+        :rtype: dict
+        :returns: The facts of each resource, empty for another checksum
+        """
+        try:
+            with open(self.path) as fileh:
+                cached = json.load(fileh)
+        except (IOError, OSError, ValueError):
+            return {}
+        if not isinstance(cached, dict) or cached.get('checksum') != checksum:
+            return {}
+        return cached.get('resources') or {}
+
+    def store(self, checksum, resources):
+        """ Cache the facts of each resource for the checksum, with the
+            facts cached before for the same checksum
+
+        :param checksum: The checksum of the running configuration
+        :param resources: The facts of each resource
+        """
+        cached = self.load(checksum)
+        cached.update(resources)
+        directory = os.path.dirname(self.path)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            # written to another file and renamed, a module reading the
+            # cache at the same time sees either the old or the new facts
+            fileno, tmp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fileno, 'w') as fileh:
+                json.dump({'checksum': checksum, 'resources': cached}, fileh)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError):
+            # the facts are gathered again by the next module
+            pass
+
+    def invalidate(self):
+        """ Remove the cached facts, once the configuration is changed
+        """
+        try:
+            os.remove(self.path)
+        except (IOError, OSError):
+            pass
+
+
+def facts_cache(module):
+    """ The facts cache of the host of a module, the host is that of the
+        persistent connection of the module
+
+    :param module: The module
+    :rtype: FactsCache
+    :returns: The facts cache, None without FACTS_CACHE_ENV or a persistent
+              connection
+    """
+    directory = os.environ.get(FACTS_CACHE_ENV)
+    socket_path = getattr(module, '_socket_path', None)
+    if not directory or not socket_path:
+        return None
+    return FactsCache(os.path.join(os.path.expanduser(directory),
+                                   '%s.json' % os.path.basename(socket_path)))
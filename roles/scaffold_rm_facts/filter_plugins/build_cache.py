@@ -0,0 +1,113 @@
+# Copyright (c) 2019 Ansible Project
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type  # pylint: disable=C0103
+
+import hashlib
+import json
+import os
+
+from ansible.module_utils._text import to_bytes
+from ansible.utils.display import Display
+
+display = Display()
+
+FILTER_PLUGINS_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+def _update_file(digest, path):
+    with open(path, 'rb') as fileh:
+        digest.update(fileh.read())
+
+
+def build_key(rm, source, build_vars):
+    """ The key for a file built from the model, a change to any of the
+        inputs of the file changes the key
+
+    :param rm: The model, as loaded by the to_model filter
+    :param source: The path to the template the file is built from
+    :param build_vars: The variables used by the template
+    :rtype: str
+    :returns: The sha1 of the model, its examples, the template, the
+              filter plugins and the variables
+    """
+    digest = hashlib.sha1()
+    digest.update(to_bytes(rm['digest']))
+    _update_file(digest, source)
+    for name in sorted(os.listdir(FILTER_PLUGINS_DIR)):
+        if name.endswith('.py'):
+            _update_file(digest, os.path.join(FILTER_PLUGINS_DIR, name))
+    digest.update(to_bytes(json.dumps(build_vars, sort_keys=True,
+                                      default=str)))
+    return digest.hexdigest()
+
+
+def build_record_path(destination, cache_dir):
+    """ The path of the build record for a file
+    """
+    destination = os.path.realpath(os.path.expanduser(destination))
+    name = hashlib.sha1(to_bytes(destination)).hexdigest()
+    return os.path.join(os.path.expanduser(cache_dir), '%s.json' % name)
+
+
+def build_record(destination, cache_dir):
+    """ The build record for a file, the key and the checksum of the file
+        when it was last built
+
+    :rtype: dict
+    :returns: The build record, empty if the file has not been built
+    """
+    path = build_record_path(destination, cache_dir)
+    try:
+        with open(path) as fileh:
+            return json.load(fileh)
+    except (IOError, OSError, ValueError):
+        display.debug("No build record for %s" % destination)
+        return {}
+
+
+def _checksum(path):
+    digest = hashlib.sha1()
+    _update_file(digest, path)
+    return digest.hexdigest()
+
+
+def stale_templates(templates, rm, templates_dir, build_vars, cache_dir):
+    """ The templates with a file to build, checked in one pass so the
+        tasks for each template run only for the files to build
+
+    :param templates: The resource_module_templates
+    :param rm: The model, as loaded by the to_model filter
+    :param templates_dir: The directory of the templates
+    :param build_vars: The variables used by the templates
+    :param cache_dir: The directory of the build records
+    :rtype: list
+    :returns: The templates with a file that does not exist, or that can be
+              overwritten and has been modified or has inputs that changed
+    """
+    stale = []
+    for template in templates:
+        destination = os.path.expanduser(template['destination'])
+        if os.path.isfile(destination):
+            if not template['overwrite']:
+                continue
+            record = build_record(destination, cache_dir)
+            source = os.path.join(templates_dir, template['source'])
+            key = build_key(rm, source, build_vars)
+            unchanged = record.get('checksum') == _checksum(destination)
+            if record.get('key') == key and unchanged:
+                continue
+        stale.append(template)
+    return stale
+
+
+class FilterModule(object):
+    def filters(self):
+        return {
+            'build_key': build_key,
+            'build_record': build_record,
+            'build_record_path': build_record_path,
+            'stale_templates': stale_templates,
+        }
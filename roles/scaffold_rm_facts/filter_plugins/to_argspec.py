@@ -6,10 +6,8 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type  # pylint: disable=C0103
 
 import pprint
-import yaml
 
 from ansible.module_utils.six import iteritems
-from ansible.module_utils.six import string_types
 from ansible.utils.display import Display
 from ansible.errors import AnsibleFilterError
 
@@ -22,10 +20,9 @@ display = Display()
 
 def retrieve_metadata(values, out):
     for key in OPTIONS_METADATA:
-        if key in values:
-            data = values.get(key, None)
-            if data:
-                out[key] = data
+        data = values.get(key, None)
+        if data:
+            out[key] = data
 
 
 def dive(obj, result):
@@ -35,31 +32,312 @@ def dive(obj, result):
         suboptions = val.get('suboptions')
         if suboptions:
             for item in SUBOPTIONS_METADATA:
-                if item in val:
+                if val.get(item) is not None:
                     result[k][item] = val[item]
             result[k]['options'] = dict()
             dive(suboptions, result[k]['options'])
 
-def to_argspec(spec):
-    if 'DOCUMENTATION' not in spec:
-        raise AnsibleFilterError("missing required element 'DOCUMENTATION'"
-                                 " in model")
 
-    if not isinstance(spec['DOCUMENTATION'], string_types):
-        raise AnsibleFilterError("value of element 'DOCUMENTATION'"
-                                 " should be of type string")
+def generate_argspec(spec):
+    if 'options' not in spec:
+        raise AnsibleFilterError("the model should be loaded with the"
+                                 " 'to_model' filter")
     result = {}
-    doc = yaml.safe_load(spec['DOCUMENTATION'])
 
-    dive(doc['options'], result)
+    dive(spec['options'], result)
+    return result
+
+
+def generate_skeleton(options):
+    """ The empty facts tree for the options, the same as
+        utils.generate_dict would generate from the argspec
+    """
+    result = {}
+    for k, val in iteritems(options):
+        if 'default' in val:
+            result[k] = val['default']
+        elif val.get('type') == 'dict':
+            result[k] = generate_skeleton(val.get('options', {}))
+        else:
+            result[k] = None
+    return result
+
+
+def index_options(options, prefix, result):
+    """ Flatten the options, each option is keyed by its dotted path
+    """
+    for k, val in iteritems(options):
+        path = prefix + k
+        result[path] = dict((key, data) for key, data in iteritems(val)
+                            if key in OPTIONS_METADATA)
+        if 'options' in val:
+            index_options(val['options'], path + '.', result)
+    return result
+
+
+# the check in rmb_helpers for a value of each type, the values of the other
+# types are not checked
+CHECKS = {
+    'str': 'check_str',
+    'int': 'check_int',
+    'float': 'check_float',
+    'bool': 'check_bool',
+    'dict': 'check_dict',
+    'list': 'check_list',
+}
+
+
+def _literal(value):
+    return pprint.pformat(value)
+
+
+def _call(indent, function, value, *literals):
+    """ The statement that calls a check of rmb_helpers with a value and
+        literals, an argument on each line when it is longer than 79 columns
+    """
+    lead = '%srmb_helpers.%s(' % (indent, function)
+    line = '%s%s)' % (lead, ', '.join([value] + [_literal(literal)
+                                                 for literal in literals]))
+    if len(line) <= 79:
+        return line
+    width = 78 - len(lead)
+    args = [value] + [pprint.pformat(literal, width=width)
+                      for literal in literals]
+    margin = '\n' + ' ' * len(lead)
+    return '%s%s)' % (lead, (',' + margin).join(arg.replace('\n', margin)
+                                                for arg in args))
+
+
+def _check(option, value, path):
+    """ The expression that checks and converts a value of an option
+    """
+    if option.get('type') == 'dict' and 'options' in option:
+        return '%s(%s)' % (_function_name(path), value)
+    if option.get('type') == 'list':
+        element = dict(option, type=option.get('elements'))
+        item = _check(element, 'item', path)
+        checked = 'rmb_helpers.check_list(%s, %s)' % (value, _literal(path))
+        if item == 'item':
+            return checked
+        return '[%s for item in %s]' % (item, checked)
+    check = CHECKS.get(option.get('type') or 'str')
+    if check is None:
+        return value
+    return 'rmb_helpers.%s(%s, %s)' % (check, value, _literal(path))
+
+
+def _function_name(path):
+    return '_normalize_%s' % path.replace('.', '_')
+
+
+def _normalizer(options, path, functions):
+    """ Generate the function that normalizes a dictionary of the options,
+        statements for each option, and a function for each of the options
+        with suboptions
+    """
+    lines = [
+        'def %s(entry):' % _function_name(path),
+        '    """ Normalize %s' % path,
+        '    """',
+        '    entry = rmb_helpers.check_dict(entry, %s)' % _literal(path),
+        _call('    ', 'check_keys', 'entry', tuple(sorted(options)), path),
+        '    result = {}',
+    ]
+    nested = []
+    for name in sorted(options):
+        option = options[name]
+        option_path = '%s.%s' % (path, name)
+        lines.append('    value = entry.get(%s)' % _literal(name))
+        if option.get('default') is not None:
+            lines.extend([
+                '    if value is None:',
+                '        value = %s' % _literal(option['default']),
+            ])
+        if option.get('required'):
+            lines.extend([
+                '    if value is None:',
+                '        raise ValueError("missing required arguments: %s'
+                ' found in %s")' % (name, path),
+            ])
+        check = _check(option, 'value', option_path)
+        if check != 'value':
+            lines.extend([
+                '    if value is not None:',
+                '        value = %s' % check,
+            ])
+        if option.get('choices'):
+            lines.append(_call('    ', 'check_choices', 'value',
+                               option['choices'], option_path))
+        lines.append('    result[%s] = value' % _literal(name))
+        if 'options' in option:
+            nested.append((option['options'], option_path))
+    lines.append('    return result')
+    functions.append('\n'.join(lines))
+    for suboptions, option_path in nested:
+        _normalizer(suboptions, option_path, functions)
+
+
+def generate_normalizer(spec):
+    """ Generate the functions that validate and normalize the facts of the
+        'config' option, straight-line code for each of its suboptions, the
+        same as utils.validate_config with the argspec
+
+    :param spec: The model, as loaded by the to_model filter
+    :rtype: str
+    :returns: The source of the functions, normalize_config is the entry
+    """
+    config = generate_argspec(spec).get('config', {})
+    functions = []
+    _normalizer(config.get('options', {}), 'config', functions)
+    if config.get('type') == 'list':
+        body = '\n'.join([
+            '    return [%s(entry)' % _function_name('config'),
+            '            for entry in rmb_helpers.check_list(config,'
+            " 'config')]",
+        ])
+    else:
+        body = '    return %s(config)' % _function_name('config')
+    functions.insert(0, '\n'.join([
+        'def normalize_config(config):',
+        '    """ Validate and normalize the facts of the \'config\' option,'
+        ' the same as',
+        '        utils.validate_config with the argument_spec',
+        '    """',
+        body,
+    ]))
+    return '\n\n\n'.join(functions)
+
+
+def _record_name(path):
+    return '%sRecord' % ''.join(part.title().replace('_', '')
+                                for part in path.split('.'))
+
 
-    result = pprint.pformat(result, indent=1)
+def _records(options, path, classes):
+    """ Generate the record class for a dictionary of the options, with a
+        slot for each option, and a record class for each of the options of
+        type dict with suboptions
+    """
+    names = sorted(options)
+    nested = []
+    init = []
+    to_dict = []
+    for name in names:
+        option = options[name]
+        if option.get('type') == 'dict' and 'default' not in option:
+            option_path = '%s.%s' % (path, name)
+            nested.append((option.get('options', {}), option_path))
+            init.append('        self.%s = %s()'
+                        % (name, _record_name(option_path)))
+            to_dict.append('        value = self.%s.to_dict()' % name)
+        else:
+            init.append('        self.%s = %s' % (
+                name, _literal(option.get('default'))))
+            to_dict.append('        value = self.%s' % name)
+        to_dict.extend([
+            '        if value not in rmb_helpers.EMPTY_VALUES:',
+            '            result[%s] = value' % _literal(name),
+        ])
+
+    lines = [
+        'class %s(object):' % _record_name(path),
+        '    """ A record of %s, the same as its facts tree' % path,
+        '    """',
+        '    __slots__ = %s' % _literal(tuple(names)),
+        '',
+        '    def __init__(self):',
+    ] + (init or ['        pass']) + [
+        '',
+        '    def to_dict(self):',
+        '        """ The facts tree of the record, without the empty values',
+        '        """',
+        '        result = {}',
+    ] + to_dict + [
+        '        return result',
+    ]
+    classes.append('\n'.join(lines))
+    for suboptions, option_path in nested:
+        _records(suboptions, option_path, classes)
+
+
+def generate_records(spec):
+    """ Generate the record classes for a 'config' entry, a class with
+        __slots__ for each dictionary of the facts tree, each record is
+        initialized the same as new_facts and converted to a dict without
+        the empty values, the same as utils.remove_empties
+
+    :param spec: The model, as loaded by the to_model filter
+    :rtype: str
+    :returns: The source of the classes, ConfigRecord is a 'config' entry
+    """
+    classes = []
+    _records(_facts_options(spec), 'config', classes)
+    return '\n\n\n'.join(classes)
+
+
+def _facts_options(spec):
+    # the facts tree is that of a single entry of the 'config' option
+    return generate_argspec(spec).get('config', {}).get('options', {})
+
+
+def to_normalizer(spec):
+    result = generate_normalizer(spec)
+    display.debug("Normalizer: %s" % result)
+    return result
+
+
+def to_records(spec):
+    result = generate_records(spec)
+    display.debug("Records: %s" % result)
+    return result
+
+
+def to_resource_key(spec):
+    """ The RESOURCE_KEY of the model, the 'config' suboption that
+        identifies a resource instance
+
+    :rtype: str
+    :returns: The key as a python literal, None when not set
+    """
+    key = spec.get('RESOURCE_KEY')
+    if key is not None and key not in _facts_options(spec):
+        raise AnsibleFilterError("RESOURCE_KEY '%s' is not a suboption of"
+                                 " 'config' in the model" % key)
+    return repr(str(key)) if key is not None else 'None'
+
+
+def to_argspec(spec):
+    result = pprint.pformat(generate_argspec(spec), indent=1)
     display.debug("Arguments: %s" % result)
     return result
 
 
+# the width of the facts skeleton and option index, they are indented by
+# at most 17 columns in the argspec
+LITERAL_WIDTH = 79 - 17
+
+
+def to_facts_skeleton(spec):
+    result = pprint.pformat(generate_skeleton(_facts_options(spec)),
+                            indent=1, width=LITERAL_WIDTH)
+    display.debug("Facts skeleton: %s" % result)
+    return result
+
+
+def to_option_index(spec):
+    result = pprint.pformat(index_options(_facts_options(spec), '', {}),
+                            indent=1, width=LITERAL_WIDTH)
+    display.debug("Option index: %s" % result)
+    return result
+
+
 class FilterModule(object):
     def filters(self):
         return {
             'to_argspec': to_argspec,
+            'to_facts_skeleton': to_facts_skeleton,
+            'to_normalizer': to_normalizer,
+            'to_option_index': to_option_index,
+            'to_records': to_records,
+            'to_resource_key': to_resource_key,
         }
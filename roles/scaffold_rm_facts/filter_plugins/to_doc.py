@@ -4,16 +4,12 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
-import os
-import shutil
-from subprocess import Popen, PIPE
-
-from copy import deepcopy
+import ast
+import yaml
 
 from ansible.module_utils.six import StringIO, string_types
 from ansible.errors import AnsibleError, AnsibleFilterError
 from ansible.utils.display import Display
-from ansible.utils.path import unfrackpath, makedirs_safe
 
 display = Display()
 
@@ -43,19 +39,13 @@ commands:
   sample: ['command 1', 'command 2', 'command 3']
 """
 
-output = StringIO()
-RM_DIR_PATH = "~/.ansible/tmp/resource_model"
-
+OPTION_KEYS = ('suboptions', 'options', 'spec')
 
-def to_list(val):
-    if isinstance(val, (list, tuple, set)):
-        return list(val)
-    elif val is not None:
-        return [val]
-    return list()
+# the documentation kept in the module by the slim build
+STUB_KEYS = ('module', 'short_description', 'version_added', 'author')
 
 
-def add(line, spaces=0, newline=True):
+def add(output, line, spaces=0, newline=True):
     line = line.rjust(len(line)+spaces, ' ')
     if newline:
         output.write(line + '\n')
@@ -63,7 +53,7 @@ def add(line, spaces=0, newline=True):
         output.write(line)
 
 
-def get_ansible_metadata(spec, _path):
+def get_ansible_metadata(spec, output):
     # write ansible metadata
     if 'ANSIBLE_METADATA' not in spec:
         raise AnsibleFilterError("missing required element 'ANSIBLE_METADATA'"
@@ -74,11 +64,11 @@ def get_ansible_metadata(spec, _path):
         raise AnsibleFilterError("value of element 'ANSIBLE_METADATA'"
                                  " should be of type string")
 
-    add('ANSIBLE_METADATA = %s' % metadata, newline=True)
+    add(output, 'ANSIBLE_METADATA = %s' % metadata, newline=True)
     # add(metadata)
 
 
-def get_documentation(spec, _path):
+def get_documentation(spec, output):
     # write documentation
     if 'DOCUMENTATION' not in spec:
         raise AnsibleFilterError("missing required element 'DOCUMENTATION'"
@@ -89,66 +79,154 @@ def get_documentation(spec, _path):
         raise AnsibleFilterError("value of element 'DOCUMENTATION' should be"
                                  " of type string")
 
-    add('DOCUMENTATION = """')
-    add('---')
-    add('%s' % doc)
-    add('"""')
+    add(output, 'DOCUMENTATION = """')
+    add(output, '---')
+    add(output, '%s' % doc)
+    add(output, '"""')
 
 
-def get_examples(spec, path):
+def get_examples(spec, output):
     # write examples
     if 'EXAMPLES' not in spec:
         raise AnsibleFilterError("missing required element 'EXAMPLES'"
                                  " in model")
 
-    add('EXAMPLES = """')
-    dir_name = os.path.dirname(path)
-    for item in to_list(spec['EXAMPLES']):
-        with open(os.path.join(dir_name, item)) as fileh:
-            add(fileh.read().strip("\n"))
-        add("\n")
-    add('"""')
+    add(output, 'EXAMPLES = """')
+    for item in spec['examples']:
+        add(output, item['text'].strip("\n"))
+        add(output, "\n")
+    add(output, '"""')
 
 
-def get_return(spec, _path):
+def get_return(spec, output):
     # write return
     ret = spec.get('RETURN')
-    add('RETURN = """')
+    add(output, 'RETURN = """')
     if ret:
-        add(ret)
+        add(output, ret)
     else:
-        add(DEFAULT_RETURN.strip())
-    add('"""')
+        add(output, DEFAULT_RETURN.strip())
+    add(output, '"""')
+
+
+def _mapping(node):
+    """ The key and value nodes of a yaml mapping node keyed by the key
+    """
+    return dict((key.value, (key, value)) for key, value in node.value)
+
+
+def _check_options(node, lineno, errors):
+    """ Check each of the (sub-)options the way ansible-doc renders them
+    """
+    if not isinstance(node, yaml.MappingNode):
+        errors.append("line %s: options should be a dictionary"
+                      % (lineno + node.start_mark.line))
+        return
+    for name, (key, value) in _mapping(node).items():
+        line = lineno + key.start_mark.line
+        if not isinstance(value, yaml.MappingNode):
+            errors.append("line %s: option '%s' should be a dictionary"
+                          % (line, name))
+            continue
+        option = _mapping(value)
+        if 'description' not in option:
+            errors.append("line %s: option '%s' must have a 'description'"
+                          " field" % (line, name))
+        if 'required' in option:
+            required = yaml.safe_load(yaml.serialize(option['required'][1]))
+            if not isinstance(required, bool):
+                errors.append("line %s: incorrect value for 'required' of"
+                              " option '%s', a boolean is needed"
+                              % (line, name))
+        for item in OPTION_KEYS:
+            if item in option:
+                _check_options(option[item][1], lineno, errors)
+
+
+def _check_yaml(section, text, lineno, errors):
+    """ Compose the yaml of a section, the line numbers of the errors are
+        those of the module source
+    """
+    try:
+        return yaml.compose(text)
+    except yaml.MarkedYAMLError as err:
+        mark = err.problem_mark or err.context_mark
+        errors.append("line %s: invalid yaml in %s, %s"
+                      % (lineno + mark.line, section,
+                         err.problem or err.context))
+    return None
+
+
+def _check_documentation(text, lineno, errors):
+    node = _check_yaml('DOCUMENTATION', text, lineno, errors)
+    if node is None:
+        return
+    if not isinstance(node, yaml.MappingNode):
+        errors.append("line %s: DOCUMENTATION should be a dictionary"
+                      % lineno)
+        return
+    doc = _mapping(node)
+    for item in ('module', 'description'):
+        if item not in doc:
+            errors.append("line %s: DOCUMENTATION is missing '%s'"
+                          % (lineno, item))
+    if 'options' in doc:
+        _check_options(doc['options'][1], lineno, errors)
+
+
+def validate_module(name, contents):
+    """ Validate the documentation of a module the way ansible-doc would,
+        without writing the module to disk and running ansible-doc for it
+
+    :param name: The name of the module
+    :param contents: The source of the module
+    :rtype: list
+    :returns: The errors found, each prefixed with the line number in
+              the module source
+    """
+    try:
+        tree = ast.parse(contents, name)
+    except SyntaxError as err:
+        return ["line %s: %s" % (err.lineno, err.msg)]
+
+    sections = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id in SECTIONS:
+                    sections[target.id] = node.value
+
+    errors = []
+    for section in SECTIONS:
+        if section not in sections:
+            errors.append("missing %s" % section)
+            continue
+        lineno = sections[section].lineno
+        try:
+            value = ast.literal_eval(sections[section])
+        except ValueError:
+            value = None
+        if section == 'ANSIBLE_METADATA':
+            if not isinstance(value, dict):
+                errors.append("line %s: ANSIBLE_METADATA should be a"
+                              " dictionary" % lineno)
+        elif not isinstance(value, string_types):
+            errors.append("line %s: %s should be a string"
+                          % (lineno, section))
+        elif section == 'DOCUMENTATION':
+            _check_documentation(value, lineno, errors)
+        elif section == 'RETURN':
+            _check_yaml(section, value, lineno, errors)
+    return errors
 
 
 def validate_model(model, contents):
-    try:
-        resource_module_dir = unfrackpath(RM_DIR_PATH)
-        makedirs_safe(resource_module_dir)
-        module_name = "%s_%s" % (model['NETWORK_OS'], model['RESOURCE'])
-        module_file_path = os.path.join(RM_DIR_PATH, '%s.%s' % (module_name,
-                                                                'py'))
-        exxpath = os.path.expanduser(module_file_path)
-        module_file_path = os.path.realpath(exxpath)
-        with open(module_file_path, 'w+') as fileh:
-            fileh.write(contents)
-
-        display.debug("Module file: %s" % module_file_path)
-
-        # validate the model
-        cmd = ["ansible-doc", "-M", os.path.dirname(module_file_path),
-               module_name]
-        proco = Popen(cmd, stdin=PIPE, stdout=PIPE, stderr=PIPE)
-        out, err = proco.communicate()
-        if err:
-            raise AnsibleError("Error while parsing module: %s" % err)
-        display.debug("Module output:\n%s" % out)
-    except Exception as err:
+    module_name = "%s_%s" % (model['NETWORK_OS'], model['RESOURCE'])
+    errors = validate_module(module_name, contents)
+    if errors:
         raise AnsibleError('Failed to validate the model with error: %s\n%s'
-                           % (err, contents))
-    finally:
-        expuser = os.path.expanduser(resource_module_dir)
-        shutil.rmtree(os.path.realpath(expuser), ignore_errors=True)
+                           % ("\n".join(errors), contents))
+    display.debug("Module %s validated" % module_name)
 
 
 def _sanitize_documentation(doc):
@@ -162,16 +240,19 @@ def _sanitize_documentation(doc):
     return "\n".join(sanitize_doc)
 
 
-def to_doc(rm, path):
-    model = deepcopy(rm)
+def to_doc(rm):
+    if 'examples' not in rm:
+        raise AnsibleFilterError("the model should be loaded with the"
+                                 " 'to_model' filter")
+    model = dict(rm)
     model['DOCUMENTATION'] = _sanitize_documentation(rm['DOCUMENTATION'])
-    path = os.path.realpath(os.path.expanduser(path))
-    if not os.path.isfile(path):
-        raise AnsibleFilterError("model file %s does not exist" % path)
 
+    # each call writes to its own buffer, the filter may be called for
+    # many models in the same process
+    output = StringIO()
     for name in SECTIONS:
         func = globals().get('get_%s' % name.lower())
-        func(model, path)
+        func(model, output)
 
     contents = output.getvalue()
     display.debug("%s" % contents)
@@ -180,8 +261,40 @@ def to_doc(rm, path):
     return contents
 
 
+def to_doc_stub(rm):
+    """ The sections of the module for the slim build, the documentation
+        only names the module, its examples and return are empty. The
+        documentation is built by to_doc into the doc-only module in docs
+    """
+    if 'examples' not in rm:
+        raise AnsibleFilterError("the model should be loaded with the"
+                                 " 'to_model' filter")
+    module_name = "%s_%s" % (rm['NETWORK_OS'], rm['RESOURCE'])
+    doc = yaml.safe_load(_sanitize_documentation(rm['DOCUMENTATION']))
+    stub = dict((key, doc[key]) for key in STUB_KEYS if key in doc)
+    stub['description'] = ['The documentation of this module is in'
+                           ' docs/%s.py, see ansible-doc -M docs %s'
+                           % (module_name, module_name)]
+
+    output = StringIO()
+    get_ansible_metadata(rm, output)
+    add(output, 'DOCUMENTATION = """')
+    add(output, '---')
+    add(output, yaml.safe_dump(stub, default_flow_style=False,
+                               width=60).strip())
+    add(output, '"""')
+    add(output, 'EXAMPLES = """"""')
+    add(output, 'RETURN = """"""')
+
+    contents = output.getvalue()
+    display.debug("%s" % contents)
+    validate_model(rm, contents)
+    return contents
+
+
 class FilterModule(object):
     def filters(self):
         return {
             'to_doc': to_doc,
+            'to_doc_stub': to_doc_stub,
         }
@@ -0,0 +1,168 @@
+# Copyright (c) 2019 Ansible Project
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type  # pylint: disable=C0103
+
+import hashlib
+import json
+import os
+import tempfile
+import yaml
+
+from ansible.module_utils._text import to_bytes
+from ansible.module_utils.six import iteritems, string_types
+from ansible.errors import AnsibleFilterError
+from ansible.utils.display import Display
+
+display = Display()
+
+# bump when the structure of the loaded model changes, to ignore the
+# models cached by a previous version
+MODEL_VERSION = 1
+
+MODEL_CACHE_DIR = "~/.ansible/tmp/rmb_models"
+
+OPTIONS_METADATA = ('type', 'elements', 'default', 'choices', 'required')
+SUBOPTIONS_METADATA = ('mutually_exclusive', 'required_together',
+                       'required_one_of', 'supports_check_mode', 'required_if')
+
+
+def to_list(val):
+    if isinstance(val, (list, tuple, set)):
+        return list(val)
+    elif val is not None:
+        return [val]
+    return list()
+
+
+def load_options(options):
+    """ Load the options of the model documentation into the options tree,
+        each option has each of the OPTIONS_METADATA and the
+        SUBOPTIONS_METADATA, None when not set in the model, the
+        description and the suboptions
+
+    :param options: The options (or suboptions) of the documentation
+    :rtype: dict
+    :returns: The options tree
+    """
+    result = {}
+    for name, values in iteritems(options or {}):
+        values = values or {}
+        option = dict((key, values.get(key))
+                      for key in OPTIONS_METADATA + SUBOPTIONS_METADATA)
+        option['description'] = values.get('description')
+        option['suboptions'] = load_options(values.get('suboptions'))
+        result[name] = option
+    return result
+
+
+def _parse(model_text, path):
+    """ Parse the model and each of the yaml sections within it
+    """
+    try:
+        spec = yaml.safe_load(model_text)
+    except yaml.YAMLError as err:
+        raise AnsibleFilterError("model file %s is not valid yaml: %s"
+                                 % (path, err))
+    if not isinstance(spec, dict):
+        raise AnsibleFilterError("model file %s should be a dictionary"
+                                 % path)
+
+    for name in ('ANSIBLE_METADATA', 'DOCUMENTATION'):
+        if name not in spec:
+            raise AnsibleFilterError("missing required element '%s'"
+                                     " in model" % name)
+        if not isinstance(spec[name], string_types):
+            raise AnsibleFilterError("value of element '%s' should be"
+                                     " of type string" % name)
+
+    model = dict(spec)
+    model['metadata'] = yaml.safe_load(spec['ANSIBLE_METADATA'])
+    model['documentation'] = yaml.safe_load(spec['DOCUMENTATION'])
+    model['options'] = load_options(model['documentation'].get('options'))
+    return model
+
+
+def _cache_path(digest, cache_dir):
+    return os.path.join(os.path.expanduser(cache_dir), '%s.json' % digest)
+
+
+def _read_cache(path):
+    try:
+        with open(path) as fileh:
+            return json.load(fileh)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_cache(path, model):
+    # written to a temporary file and moved into place, models may be
+    # loaded concurrently when built in batch
+    dir_name = os.path.dirname(path)
+    if not os.path.isdir(dir_name):
+        try:
+            os.makedirs(dir_name)
+        except OSError:
+            if not os.path.isdir(dir_name):
+                raise
+    fileh, tmp_path = tempfile.mkstemp(dir=dir_name)
+    with os.fdopen(fileh, 'w') as fileh:
+        json.dump(model, fileh)
+    os.rename(tmp_path, path)
+
+
+def to_model(path, cache_dir=MODEL_CACHE_DIR):
+    """ Load a model, the model and each of its sections are parsed once
+        and the result is cached by the sha1 of the model file, the
+        examples are read from their files each time
+
+    :param path: The path to the model file
+    :param cache_dir: The directory of the cached models, None to disable
+    :rtype: dict
+    :returns: The sections of the model as written and
+
+        - path: The path to the model file
+        - digest: The sha1 of the model and its examples
+        - metadata: The parsed ANSIBLE_METADATA
+        - documentation: The parsed DOCUMENTATION
+        - options: The options tree of the DOCUMENTATION
+        - examples: The name and text of each of the EXAMPLES
+    """
+    path = os.path.realpath(os.path.expanduser(path))
+    if not os.path.isfile(path):
+        raise AnsibleFilterError("model file %s does not exist" % path)
+    with open(path, 'rb') as fileh:
+        model_text = fileh.read()
+
+    digest = hashlib.sha1(to_bytes('%s\n' % MODEL_VERSION))
+    digest.update(model_text)
+    model_digest = digest.hexdigest()
+
+    model = None
+    if cache_dir:
+        model = _read_cache(_cache_path(model_digest, cache_dir))
+    if model is None:
+        display.debug("Parsing model %s" % path)
+        model = _parse(model_text, path)
+        if cache_dir:
+            _write_cache(_cache_path(model_digest, cache_dir), model)
+
+    model['path'] = path
+    model['examples'] = []
+    dir_name = os.path.dirname(path)
+    for item in to_list(model.get('EXAMPLES')):
+        with open(os.path.join(dir_name, item)) as fileh:
+            text = fileh.read()
+        model['examples'].append({'name': item, 'text': text})
+        digest.update(to_bytes(text))
+    model['digest'] = digest.hexdigest()
+    return model
+
+
+class FilterModule(object):
+    def filters(self):
+        return {
+            'to_model': to_model,
+        }
@@ -0,0 +1,253 @@
+# Copyright (c) 2019 Ansible Project
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type  # pylint: disable=C0103
+
+import pprint
+import re
+
+from ansible.module_utils.six import iteritems
+from ansible.utils.display import Display
+from ansible.errors import AnsibleFilterError
+
+display = Display()
+
+BOOLEAN_VALUES = {'true': True, 'false': False}
+
+STRUCTURED_FORMATS = ('json', 'xml')
+
+
+def _option(options, option):
+    """ Find an option of the facts tree by its dotted path
+    """
+    found = None
+    for key in option.split('.'):
+        if found is not None and found['type'] != 'dict':
+            raise AnsibleFilterError("parser option '%s' should be within"
+                                     " options of type dict" % option)
+        if key not in options:
+            raise AnsibleFilterError("parser option '%s' is not a suboption"
+                                     " of 'config' in the model" % option)
+        found = options[key]
+        options = found['suboptions']
+    return found
+
+
+def generate_parsers(spec):
+    """ Compile the PARSERS of the model, each parser is a regex for a line
+        of a resource instance with one group for the value of an option.
+        The regexes are combined into a single regex, each wrapped in a
+        group, the group of the regex that matched is the lastindex of the
+        match and the group of the value follows it. The setval of a parser
+        is the format of the command for the value
+
+    :param spec: The model, as loaded by the to_model filter
+    :rtype: list
+    :returns: The parsers, in the order of the combined regex
+    """
+    if 'options' not in spec:
+        raise AnsibleFilterError("the model should be loaded with the"
+                                 " 'to_model' filter")
+    options = spec['options'].get('config', {}).get('suboptions', {})
+    result = []
+    group = 1
+    for entry in spec.get('PARSERS') or []:
+        for key in ('option', 'getval'):
+            if key not in entry:
+                raise AnsibleFilterError("missing required element '%s' in"
+                                         " parser %s" % (key, entry))
+        try:
+            regex = re.compile(entry['getval'])
+        except re.error as err:
+            raise AnsibleFilterError("invalid getval for parser option '%s':"
+                                     " %s" % (entry['option'], err))
+        if regex.groups != 1:
+            raise AnsibleFilterError("the getval of parser option '%s' should"
+                                     " have exactly one group"
+                                     % entry['option'])
+
+        option = _option(options, entry['option'])
+        option_type = entry.get('type') or option['type'] or 'str'
+        is_list = option_type == 'list'
+        if is_list:
+            option_type = option['elements'] or 'str'
+        values = entry.get('values')
+        if values is None and option_type == 'bool':
+            values = BOOLEAN_VALUES
+        texts = None
+        if values:
+            values = dict((str(k), v) for k, v in iteritems(values))
+            texts = dict((v, k) for k, v in iteritems(values))
+
+        setval = entry.get('setval')
+        if setval is not None:
+            try:
+                setval.format('')
+            except (IndexError, KeyError, ValueError) as err:
+                raise AnsibleFilterError("the setval of parser option '%s'"
+                                         " should have a single '{}' for the"
+                                         " value: %s" % (entry['option'], err))
+
+        result.append({
+            'group': group,
+            'getval': entry['getval'],
+            'setval': setval,
+            'path': tuple(entry['option'].split('.')),
+            'type': option_type,
+            'list': is_list,
+            'values': values or None,
+            'texts': texts,
+        })
+        group += regex.groups + 1
+    return result
+
+
+def to_resource_delimiter(spec):
+    """ The RESOURCE_DELIMITER of the model, a regex matched at the start of
+        each line of the configuration, a line that matches starts the
+        configuration of a resource instance
+
+    :param spec: The model, as loaded by the to_model filter
+    :rtype: str
+    :returns: The regex, as a python string literal, 'None' without one
+    """
+    delimiter = spec.get('RESOURCE_DELIMITER')
+    if not delimiter:
+        return 'None'
+    try:
+        re.compile(delimiter)
+    except re.error as err:
+        raise AnsibleFilterError("invalid RESOURCE_DELIMITER '%s': %s"
+                                 % (delimiter, err))
+    return repr(str(delimiter))
+
+
+def to_config_command(spec):
+    """ The CONFIG_COMMAND of the model, the command for the configuration
+        of the resource only, read when the resource is not given its
+        section of the running configuration. Defaults to the section of
+        the RESOURCE_DELIMITER, a model without a RESOURCE_DELIMITER
+        requires one
+
+    :param spec: The model, as loaded by the to_model filter
+    :rtype: str
+    :returns: The command, as a python string literal
+    """
+    command = spec.get('CONFIG_COMMAND')
+    if not command:
+        delimiter = spec.get('RESOURCE_DELIMITER')
+        if not delimiter:
+            raise AnsibleFilterError("a model without a RESOURCE_DELIMITER"
+                                     " requires a CONFIG_COMMAND")
+        command = 'show running-config | section %s' % delimiter
+    return repr(str(command.strip()))
+
+
+def to_fetch_instance(spec):
+    """ The FETCH_INSTANCE of the model, the command for the configuration
+        of the named resource instances with a '{}' within a regex of the
+        device, for the RESOURCE_KEY of an instance or a group of them
+
+    :param spec: The model, as loaded by the to_model filter
+    :rtype: str
+    :returns: The command, as a python string literal, 'None' without one
+    """
+    command = spec.get('FETCH_INSTANCE')
+    if not command:
+        return 'None'
+    if not spec.get('RESOURCE_KEY'):
+        raise AnsibleFilterError("FETCH_INSTANCE requires a RESOURCE_KEY in"
+                                 " the model")
+    try:
+        command.format('')
+    except (IndexError, KeyError, ValueError) as err:
+        raise AnsibleFilterError("FETCH_INSTANCE should have a single '{}'"
+                                 " for the RESOURCE_KEY: %s" % err)
+    return repr(str(command))
+
+
+def generate_structured(spec):
+    """ Compile the STRUCTURED source of the model, a command with JSON or
+        XML output and the path of each option in the output of a resource
+        instance. The paths are dotted, the keys of a JSON object or the
+        tags of XML elements
+
+    :param spec: The model, as loaded by the to_model filter
+    :rtype: dict
+    :returns: The structured source, None without one
+    """
+    structured = spec.get('STRUCTURED')
+    if not structured:
+        return None
+    if 'options' not in spec:
+        raise AnsibleFilterError("the model should be loaded with the"
+                                 " 'to_model' filter")
+    for key in ('command', 'instances', 'fields'):
+        if not structured.get(key):
+            raise AnsibleFilterError("missing required element '%s' in"
+                                     " STRUCTURED" % key)
+    output_format = structured.get('format', 'json')
+    if output_format not in STRUCTURED_FORMATS:
+        formats = ', '.join(STRUCTURED_FORMATS)
+        raise AnsibleFilterError("the format of STRUCTURED should be one of"
+                                 " %s, got '%s'" % (formats, output_format))
+
+    options = spec['options'].get('config', {}).get('suboptions', {})
+    fields = []
+    for entry in structured['fields']:
+        for key in ('option', 'path'):
+            if key not in entry:
+                raise AnsibleFilterError("missing required element '%s' in"
+                                         " STRUCTURED field %s" % (key, entry))
+        option = _option(options, entry['option'])
+        option_type = entry.get('type') or option['type'] or 'str'
+        is_list = option_type == 'list'
+        if is_list:
+            option_type = option['elements'] or 'str'
+        values = entry.get('values')
+        # the values of XML are text, JSON has its own booleans
+        if values is None and option_type == 'bool' and output_format == 'xml':
+            values = BOOLEAN_VALUES
+        texts = None
+        if values:
+            values = dict((str(k), v) for k, v in iteritems(values))
+            texts = dict((v, k) for k, v in iteritems(values))
+        fields.append({
+            'path': tuple(str(entry['path']).split('.')),
+            'option': tuple(entry['option'].split('.')),
+            'type': option_type,
+            'list': is_list,
+            'values': values or None,
+            'texts': texts,
+        })
+    return {
+        'command': structured['command'],
+        'format': output_format,
+        'instances': tuple(str(structured['instances']).split('.')),
+        'fields': fields,
+    }
+
+
+def to_structured(spec):
+    result = pprint.pformat(generate_structured(spec), indent=1)
+    display.debug("Structured: %s" % result)
+    return result
+
+
+def to_parsers(spec):
+    result = pprint.pformat(generate_parsers(spec), indent=1)
+    display.debug("Parsers: %s" % result)
+    return result
+
+
+class FilterModule(object):
+    def filters(self):
+        return {
+            'to_config_command': to_config_command,
+            'to_fetch_instance': to_fetch_instance,
+            'to_parsers': to_parsers,
+            'to_resource_delimiter': to_resource_delimiter,
+            'to_structured': to_structured,
+        }